@@ -4,30 +4,63 @@ Flask Application Factory
 Creates and configures the Flask web application.
 """
 
+from typing import Optional
+
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+from config.settings import settings
 from utils.logging_config import setup_logging, get_logger
+from utils.response_cache import ResponseCache
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = get_logger(__name__)
 
 
-def create_app(agent_system) -> Flask:
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson."""
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def create_app(agent_system, response_cache: Optional[ResponseCache] = None) -> Flask:
     """
     Create and configure the Flask application.
 
     Args:
         agent_system: ContextAwareRetrievalAgent instance
+        response_cache: Optional response cache; built from settings
+            when omitted and caching is enabled
 
     Returns:
         Configured Flask application
     """
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     CORS(app)
 
     # Store agent in app config
     app.config['AGENT'] = agent_system
 
+    if response_cache is None and settings.enable_caching:
+        response_cache = _build_response_cache(agent_system)
+    app.config['RESPONSE_CACHE'] = response_cache
+
     # Register routes
     from api.routes import register_routes
     register_routes(app)
@@ -49,3 +82,25 @@ def create_app(agent_system) -> Flask:
     logger.info("Flask application created successfully")
 
     return app
+
+
+def _build_response_cache(agent_system) -> ResponseCache:
+    """Build the response cache from settings."""
+    embed_fn = None
+    if settings.cache_semantic:
+        retriever = getattr(agent_system, "retriever", None)
+        embeddings = getattr(getattr(retriever, "vectorstore", None), "embeddings", None)
+        if embeddings is not None:
+            embed_fn = embeddings.embed_query
+        else:
+            logger.warning("No query embeddings available, semantic cache disabled")
+
+    logger.info(f"Response cache enabled (ttl={settings.cache_ttl}s)")
+
+    return ResponseCache(
+        ttl=settings.cache_ttl,
+        max_entries=settings.cache_max_entries,
+        embed_fn=embed_fn,
+        similarity_threshold=settings.cache_similarity_threshold,
+        redis_url=settings.redis_url
+    )
@@ -4,8 +4,9 @@ API Routes
 RESTful API endpoints for the RAG system.
 """
 
-from flask import Blueprint, request, jsonify, current_app, render_template_string
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 
+from config import MAX_QUERY_LENGTH
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -77,26 +78,40 @@ HTML_TEMPLATE = '''
             addMessage(query, 'user');
             input.value = '';
 
-            try {
-                const res = await fetch('/api/query', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({query})
-                });
-                const data = await res.json();
-
-                let meta = `Mode: ${data.generation_mode} | Confidence: ${(data.confidence*100).toFixed(0)}% | Time: ${data.processing_time?.toFixed(2)}s`;
-                addMessage(data.answer, 'assistant', meta);
-            } catch (err) {
-                addMessage('Error: ' + err.message, 'assistant');
-            }
+            const div = addMessage('', 'assistant');
+            let answer = '';
+            const source = new EventSource('/api/query/stream?query=' + encodeURIComponent(query));
+
+            source.onmessage = e => {
+                const data = JSON.parse(e.data);
+                if (data.type === 'token') {
+                    answer += data.content;
+                    setMessage(div, answer);
+                } else if (data.type === 'done') {
+                    source.close();
+                    let meta = `Mode: ${data.generation_mode} | Confidence: ${(data.confidence*100).toFixed(0)}% | Time: ${data.processing_time?.toFixed(2)}s`;
+                    setMessage(div, data.answer, meta);
+                } else if (data.type === 'error') {
+                    source.close();
+                    setMessage(div, 'Error: ' + data.error);
+                }
+            };
+            source.onerror = () => {
+                source.close();
+                if (!answer) setMessage(div, 'Error: connection lost');
+            };
         }
 
         function addMessage(text, type, meta='') {
             const div = document.createElement('div');
             div.className = 'message ' + type;
-            div.innerHTML = text + (meta ? '<div class="meta">' + meta + '</div>' : '');
+            setMessage(div, text, meta);
             messages.appendChild(div);
+            return div;
+        }
+
+        function setMessage(div, text, meta='') {
+            div.innerHTML = text + (meta ? '<div class="meta">' + meta + '</div>' : '');
             messages.scrollTop = messages.scrollHeight;
         }
     </script>
@@ -104,49 +119,124 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+# The page has no template variables, so it is encoded once and served as-is
+_INDEX_HTML = HTML_TEMPLATE.encode("utf-8")
+
+
+def _response_payload(response) -> dict:
+    """Serialize a RAGResponse for the query endpoint."""
+    return {
+        "answer": response.answer,
+        "confidence": response.confidence,
+        "sources": response.sources,
+        "generation_mode": response.generation_mode,
+        "processing_time": response.processing_time,
+        "metadata": response.metadata
+    }
+
+
+def _sse_event(data: dict) -> str:
+    """Format a dictionary as a server-sent event."""
+    return f"data: {current_app.json.dumps(data)}\n\n"
+
 
 def register_routes(app):
     """Register all API routes."""
+    # The agent and cache are fixed at app creation, so bind them once here
+    agent = app.config.get('AGENT')
+    cache = app.config.get('RESPONSE_CACHE')
 
     @app.route('/')
     def index():
         """Serve web interface."""
-        return render_template_string(HTML_TEMPLATE)
+        response = Response(_INDEX_HTML, mimetype="text/html")
+        response.headers["Cache-Control"] = "public, max-age=3600"
+        return response
 
     @app.route('/api/query', methods=['POST'])
     def query():
         """Process a query."""
         try:
-            data = request.get_json()
-            if not data or 'query' not in data:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not isinstance(data.get('query'), str):
                 return jsonify({"error": "Query required"}), 400
 
             query_text = data['query'].strip()
             if not query_text:
                 return jsonify({"error": "Empty query"}), 400
 
-            if len(query_text) > 1000:
+            if len(query_text) > MAX_QUERY_LENGTH:
                 return jsonify({"error": "Query too long"}), 400
 
-            agent = current_app.config.get('AGENT')
             if not agent:
                 return jsonify({"error": "Agent not initialized"}), 500
 
-            response = agent.process_query(query_text)
+            if cache is None:
+                return jsonify(_response_payload(agent.process_query(query_text)))
+
+            payload, hit = cache.get_or_compute(
+                query_text,
+                lambda: _response_payload(agent.process_query(query_text)),
+                cacheable=lambda p: p["generation_mode"] != "error"
+            )
+            if hit:
+                logger.info(f"Cache hit: {query_text[:100]}")
 
-            return jsonify({
-                "answer": response.answer,
-                "confidence": response.confidence,
-                "sources": response.sources,
-                "generation_mode": response.generation_mode,
-                "processing_time": response.processing_time,
-                "metadata": response.metadata
-            })
+            return jsonify(payload)
 
         except Exception as e:
             logger.error(f"Query error: {e}")
             return jsonify({"error": str(e)}), 500
 
+    @app.route('/api/query/stream', methods=['GET', 'POST'])
+    def query_stream():
+        """Process a query, streaming the answer as server-sent events."""
+        if request.method == 'GET':
+            query_text = request.args.get('query', '').strip()
+        else:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not isinstance(data.get('query'), str):
+                return jsonify({"error": "Query required"}), 400
+            query_text = data['query'].strip()
+
+        if not query_text:
+            return jsonify({"error": "Empty query"}), 400
+
+        if len(query_text) > MAX_QUERY_LENGTH:
+            return jsonify({"error": "Query too long"}), 400
+
+        if not agent:
+            return jsonify({"error": "Agent not initialized"}), 500
+
+        def generate():
+            try:
+                payload, embedding = (
+                    cache.lookup(query_text) if cache is not None else (None, None)
+                )
+                if payload is not None:
+                    logger.info(f"Cache hit: {query_text[:100]}")
+                    yield _sse_event({"type": "done", **payload})
+                    return
+
+                for event in agent.stream_query(query_text):
+                    if event["type"] == "token":
+                        yield _sse_event(event)
+                        continue
+
+                    payload = _response_payload(event["response"])
+                    if cache is not None and payload["generation_mode"] != "error":
+                        cache.set(query_text, payload, embedding=embedding)
+                    yield _sse_event({"type": "done", **payload})
+
+            except Exception as e:
+                logger.error(f"Stream error: {e}")
+                yield _sse_event({"type": "error", "error": str(e)})
+
+        response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
     @app.route('/api/health', methods=['GET'])
     def health():
         """Health check endpoint."""
@@ -159,7 +249,6 @@ def register_routes(app):
     @app.route('/api/stats', methods=['GET'])
     def stats():
         """Get system statistics."""
-        agent = current_app.config.get('AGENT')
         if not agent:
             return jsonify({"error": "Agent not initialized"}), 500
 
@@ -168,7 +257,6 @@ def register_routes(app):
     @app.route('/api/catalog', methods=['GET'])
     def catalog():
         """Get catalog information."""
-        agent = current_app.config.get('AGENT')
         if not agent:
             return jsonify({"error": "Agent not initialized"}), 500
 
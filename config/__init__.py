@@ -6,6 +6,7 @@ from .constants import (
     COURSE_CODE_PATTERN,
     LECTURER_PATTERN,
     SECTION_KEYWORDS,
+    SECTION_KEYWORDS_LOWER,
     CONFIDENCE_WEIGHTS,
     LECTURER_QUERY_KEYWORDS,
     COMPARISON_QUERY_KEYWORDS,
@@ -27,6 +28,7 @@ __all__ = [
     "COURSE_CODE_PATTERN",
     "LECTURER_PATTERN",
     "SECTION_KEYWORDS",
+    "SECTION_KEYWORDS_LOWER",
     "CONFIDENCE_WEIGHTS",
     "LECTURER_QUERY_KEYWORDS",
     "COMPARISON_QUERY_KEYWORDS",
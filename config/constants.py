@@ -33,6 +33,11 @@ SECTION_KEYWORDS: Dict[str, List[str]] = {
     "contents": ["Course Contents", "Course Summary", "Study material"],
 }
 
+SECTION_KEYWORDS_LOWER: Dict[str, List[str]] = {
+    key: [section.lower() for section in sections]
+    for key, sections in SECTION_KEYWORDS.items()
+}
+
 # ===== Confidence Calculation Weights =====
 
 CONFIDENCE_WEIGHTS: Dict[str, Dict[str, float]] = {
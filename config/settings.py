@@ -19,15 +19,27 @@ class AppSettings(BaseSettings):
 
     # ===== Model Configuration =====
     embed_model: str = "Salesforce/SFR-Embedding-Mistral"
+    embed_dtype: Optional[str] = None
     rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_backend: str = "torch"
+    rerank_model_file: Optional[str] = None
+    rerank_dtype: Optional[str] = None
+    rerank_num_threads: Optional[int] = None
     ollama_model: str = "llama3.1:latest"
     ollama_base_url: str = "http://localhost:11434"
+    ollama_max_keepalive: int = 32
+    ollama_keep_alive: str = "10m"
 
     # ===== Agent Configuration =====
     top_k_rerank: int = 5
+    rerank_batch_size: int = 64
+    rerank_shallow_k: Optional[int] = 20
+    skip_lecturer_rerank: bool = True
     default_k: int = 12
     lecturer_k: int = 40
     device: str = "cuda:4"
+    parallel_comparison: bool = False
+    max_comparison_workers: int = 8
 
     # ===== Web Server Configuration =====
     host: str = "127.0.0.1"
@@ -38,8 +50,19 @@ class AppSettings(BaseSettings):
     max_context_length: int = 4000
     temperature: float = 0.0
     enable_caching: bool = False
+    extraction_cache_size: int = 1024
+    enable_llm_extraction_fallback: bool = True
+    enable_semantic_confidence: bool = True
+    confidence_timeout_s: Optional[float] = 5.0
     log_level: str = "INFO"
 
+    # ===== Response Cache =====
+    cache_ttl: int = 3600
+    cache_max_entries: int = 1024
+    cache_semantic: bool = False
+    cache_similarity_threshold: float = 0.95
+    redis_url: Optional[str] = None
+
     class Config:
         """Pydantic configuration"""
         env_prefix = "RAG_"
@@ -1,15 +1,26 @@
 """Core module for Academic RAG System"""
 
-from .extractors import EntityExtractor
-from .retriever import VectorRetriever
-from .reranker import DocumentReranker
-from .context_expander import ContextExpander
-from .generator import AnswerGenerator
-
-__all__ = [
-    "EntityExtractor",
-    "VectorRetriever",
-    "DocumentReranker",
-    "ContextExpander",
-    "AnswerGenerator",
-]
+import importlib
+from typing import Any
+
+# Exports are imported on first access, so using one component (e.g. the
+# extractor) does not pull in torch and sentence-transformers for the reranker
+_EXPORTS = {
+    "EntityExtractor": ".extractors",
+    "VectorRetriever": ".retriever",
+    "DocumentReranker": ".reranker",
+    "ContextExpander": ".context_expander",
+    "AnswerGenerator": ".generator",
+    "GenerationError": ".generator",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -5,15 +5,48 @@ Intelligent context expansion for retrieval augmentation.
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Set
+from functools import lru_cache
+from itertools import chain
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from langchain_core.documents import Document
 
-from config.constants import SECTION_KEYWORDS
+from config.constants import SECTION_KEYWORDS, SECTION_KEYWORDS_LOWER
+from models.doc_view import DocView
 from utils.query_analysis import infer_target_sections
 
 logger = logging.getLogger(__name__)
 
+# Known section title -> lowercase form, so lookups skip case-folding
+_SECTION_TITLE_LOWER: Dict[str, str] = {
+    title: lower
+    for key, titles in SECTION_KEYWORDS.items()
+    for title, lower in zip(titles, SECTION_KEYWORDS_LOWER[key])
+}
+
+
+# Comparison axes in output order, each with the query keywords that select it.
+# "prerequisite" and "learning outcome" are covered by their shorter keywords.
+_COMPARISON_AXES: Tuple[Tuple[Tuple[str, ...], Tuple[str, ...]], ...] = (
+    (("prereq",), ("Prerequisites",)),
+    (("assessment", "exam", "grading"),
+     ("Assessment method and criteria", "Merged: Assessment method and criteria")),
+    (("outcome",), ("Learning Outcomes",)),
+    (("teaching",), ("Teaching method and planned learning activities",)),
+    (("content", "summary", "syllabus", "topics"),
+     ("Course Contents", "Course Summary", "Study material")),
+)
+_AXIS_BY_KEYWORD: Dict[str, int] = {
+    keyword: index
+    for index, (keywords, _) in enumerate(_COMPARISON_AXES)
+    for keyword in keywords
+}
+
+
+def _lower_section(section_title: str) -> str:
+    """Lowercase a section title, using the precomputed form when known."""
+    return _SECTION_TITLE_LOWER.get(section_title) or section_title.lower()
+
 
 class ContextExpander:
     """
@@ -37,7 +70,8 @@ class ContextExpander:
         documents: List[Document],
         query: str,
         focus_code: Optional[str] = None,
-        max_additional: int = 3
+        max_additional: int = 3,
+        views: Optional[List[DocView]] = None
     ) -> List[Document]:
         """
         Expand context with related document sections.
@@ -47,6 +81,7 @@ class ContextExpander:
             query: User query for section inference
             focus_code: Course code to focus expansion on
             max_additional: Maximum additional docs to add
+            views: Precomputed views of documents, in the same order
 
         Returns:
             Expanded list of documents
@@ -72,36 +107,27 @@ class ContextExpander:
             )
 
         # Get existing section titles to avoid duplicates
-        existing_sections: Set[str] = set()
-        for doc in documents:
-            section = (doc.metadata or {}).get("section_title", "")
-            if section:
-                existing_sections.add(section.lower())
+        existing_sections: Set[str] = {
+            view.section_lower
+            for view in views or map(DocView, documents)
+            if view.section_lower
+        }
+
+        # Fetch all missing sections in one round-trip, then keep the first
+        # doc per section in target order
+        missing = [s for s in target_sections if _lower_section(s) not in existing_sections]
+        fetched = self._fetch_sections([focus_code], missing)
 
-        # Fetch additional sections
         additional_docs: List[Document] = []
 
-        for section_title in target_sections:
+        for section_title in missing:
             if len(additional_docs) >= max_additional:
                 break
 
-            if section_title.lower() in existing_sections:
-                continue
-
-            try:
-                fetched = self.filter_fetcher({
-                    "course_code": focus_code,
-                    "section_title": section_title
-                }, k=1)
-
-                for doc in fetched:
-                    if len(additional_docs) < max_additional:
-                        additional_docs.append(doc)
-                        existing_sections.add(section_title.lower())
-                        logger.debug(f"Added section '{section_title}' for {focus_code}")
-
-            except Exception as e:
-                logger.warning(f"Failed to fetch section {section_title}: {e}")
+            doc = fetched.get((focus_code, section_title))
+            if doc is not None:
+                additional_docs.append(doc)
+                logger.debug(f"Added section '{section_title}' for {focus_code}")
 
         if additional_docs:
             logger.info(f"Expanded context with {len(additional_docs)} additional docs")
@@ -112,7 +138,8 @@ class ContextExpander:
         self,
         documents: List[Document],
         comparison_codes: List[str],
-        axes: List[str]
+        axes: List[str],
+        views: Optional[List[DocView]] = None
     ) -> List[Document]:
         """
         Expand context for comparison queries ensuring fair representation.
@@ -121,6 +148,7 @@ class ContextExpander:
             documents: Initial retrieved documents
             comparison_codes: Course codes to compare
             axes: Comparison axes (section titles)
+            views: Precomputed views of documents, in the same order
 
         Returns:
             Expanded documents with fair representation
@@ -128,42 +156,94 @@ class ContextExpander:
         if not self.filter_fetcher or not comparison_codes:
             return documents
 
-        # Track what we have per course
-        docs_per_course: Dict[str, List[Document]] = {code: [] for code in comparison_codes}
+        if views is None:
+            views = [DocView(doc) for doc in documents]
+
+        # Track the sections we have per course
+        sections_per_course: Dict[str, Set[str]] = {code: set() for code in comparison_codes}
 
-        for doc in documents:
-            code = (doc.metadata or {}).get("course_code", "")
-            if code in docs_per_course:
-                docs_per_course[code].append(doc)
+        for view in views:
+            if view.course_code in sections_per_course:
+                sections_per_course[view.course_code].add(view.section_lower)
 
         # Ensure each course has relevant sections
-        additional_docs: List[Document] = []
+        missing: Dict[str, List[str]] = {}
 
         for code in comparison_codes:
-            existing_sections = {
-                (d.metadata or {}).get("section_title", "").lower()
-                for d in docs_per_course[code]
-            }
-
-            for axis in axes:
-                if axis.lower() in existing_sections:
-                    continue
+            existing_sections = sections_per_course[code]
+            missing[code] = [axis for axis in axes if _lower_section(axis) not in existing_sections]
 
-                try:
-                    fetched = self.filter_fetcher({
-                        "course_code": code,
-                        "section_title": axis
-                    }, k=1)
-
-                    additional_docs.extend(fetched)
+        # One combined fetch for every (course, section) pair
+        fetched = self._fetch_sections(
+            [code for code in comparison_codes if missing[code]],
+            list(dict.fromkeys(axis for sections in missing.values() for axis in sections))
+        )
 
-                except Exception as e:
-                    logger.warning(f"Failed to fetch {axis} for {code}: {e}")
+        additional_docs: List[Document] = [
+            fetched[(code, axis)]
+            for code in comparison_codes
+            for axis in missing[code]
+            if (code, axis) in fetched
+        ]
 
         logger.info(f"Comparison expansion added {len(additional_docs)} docs")
 
         return documents + additional_docs
 
+    def _fetch_sections(
+        self,
+        codes: List[str],
+        sections: List[str]
+    ) -> Dict[Tuple[str, str], Document]:
+        """
+        Fetch sections for several courses with a single filtered query.
+
+        Args:
+            codes: Course codes to fetch
+            sections: Section titles to fetch
+
+        Returns:
+            First fetched document per (course_code, section_title) pair
+        """
+        if not codes or not sections:
+            return {}
+
+        # Over-fetch so multi-part sections rarely crowd out other pairs
+        k = 2 * len(codes) * len(sections)
+
+        try:
+            fetched = self.filter_fetcher({
+                "course_code": codes,
+                "section_title": sections
+            }, k=k)
+        except Exception as e:
+            logger.warning(f"Failed to fetch sections {sections} for {codes}: {e}")
+            return {}
+
+        by_pair: Dict[Tuple[str, str], Document] = {}
+        for doc in fetched:
+            meta = doc.metadata or {}
+            by_pair.setdefault((meta.get("course_code", ""), meta.get("section_title", "")), doc)
+
+        # A full page may have been truncated; fetch absent pairs one by one
+        if len(fetched) >= k:
+            for code in codes:
+                for section in sections:
+                    if (code, section) in by_pair:
+                        continue
+                    try:
+                        docs = self.filter_fetcher({
+                            "course_code": code,
+                            "section_title": section
+                        }, k=1)
+                    except Exception as e:
+                        logger.warning(f"Failed to fetch {section} for {code}: {e}")
+                        continue
+                    if docs:
+                        by_pair[(code, section)] = docs[0]
+
+        return by_pair
+
     def _select_focus_code(self, documents: List[Document]) -> Optional[str]:
         """Select primary course code from documents."""
         if not documents:
@@ -181,49 +261,31 @@ class ContextExpander:
         Returns:
             List of relevant section titles
         """
-        base = infer_target_sections(query) or []
-        query_lower = query.lower()
-        axes: List[str] = []
-
-        def add_if_matches(condition, section_names):
-            if condition:
-                axes.extend(section_names)
-
-        add_if_matches(
-            "prereq" in query_lower or "prerequisite" in query_lower,
-            ["Prerequisites"]
-        )
-        add_if_matches(
-            any(w in query_lower for w in ["assessment", "exam", "grading"]),
-            ["Assessment method and criteria", "Merged: Assessment method and criteria"]
-        )
-        add_if_matches(
-            "learning outcome" in query_lower or "outcome" in query_lower,
-            ["Learning Outcomes"]
-        )
-        add_if_matches(
-            "teaching" in query_lower,
-            ["Teaching method and planned learning activities"]
-        )
-        add_if_matches(
-            any(w in query_lower for w in ["content", "summary", "syllabus", "topics"]),
-            ["Course Contents", "Course Summary", "Study material"]
-        )
-
-        # Remove duplicates while preserving order
-        ordered = []
-        seen = set()
-        all_sections = (
-            base + axes +
-            SECTION_KEYWORDS["contents"] +
-            SECTION_KEYWORDS["learning"] +
-            SECTION_KEYWORDS["prereq"] +
-            SECTION_KEYWORDS["assessment"]
-        )
-
-        for section in all_sections:
-            if section not in seen:
-                ordered.append(section)
-                seen.add(section)
-
-        return ordered
+        return list(_infer_comparison_axes(query))
+
+
+@lru_cache(maxsize=512)
+def _infer_comparison_axes(query: str) -> Tuple[str, ...]:
+    """Memoized body of ContextExpander.infer_comparison_axes."""
+    base = infer_target_sections(query) or []
+    query_lower = query.lower()
+    hits = {
+        index
+        for keyword, index in _AXIS_BY_KEYWORD.items()
+        if keyword in query_lower
+    }
+    axes = [
+        section
+        for index, (_, sections) in enumerate(_COMPARISON_AXES)
+        if index in hits
+        for section in sections
+    ]
+
+    # Remove duplicates while preserving order
+    return tuple(dict.fromkeys(chain(
+        base, axes,
+        SECTION_KEYWORDS["contents"],
+        SECTION_KEYWORDS["learning"],
+        SECTION_KEYWORDS["prereq"],
+        SECTION_KEYWORDS["assessment"]
+    )))
@@ -7,12 +7,18 @@ Multi-stage entity extraction with regex, fuzzy matching, and LLM fallback.
 import re
 import json
 import logging
-from typing import Dict, Any, List, Optional, Set
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from langchain_core.documents import Document
 from langchain_ollama import ChatOllama
 
-from config.constants import COURSE_CODE_REGEX
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from config.constants import COURSE_CODE_PATTERN, MAX_QUERY_LENGTH
 from models.catalog import MetadataCatalog
 from utils.query_analysis import (
     extract_lecturer_from_query,
@@ -22,6 +28,35 @@ from utils.query_analysis import (
 
 logger = logging.getLogger(__name__)
 
+# Patterns compiled once at import; used on every query
+_QUOTED_PATTERN = re.compile(r"'([^']+)'|\"([^\"]+)\"")
+# Each title pattern is paired with a literal keyword it cannot match without,
+# so queries lacking the keyword skip the (backtracking) search entirely
+_TITLE_PATTERNS = tuple(
+    (keyword, re.compile(pattern, re.IGNORECASE))
+    for keyword, pattern in (
+        ("course", r"(?:course)\s+([A-Za-z][\w\s&\-:]+)"),
+        ("course", r"([A-Za-z][\w\s&\-:]+)\s+course"),
+        ("course", r"for\s+(?:the\s+)?([A-Za-z][\w\s&\-:]+)\s+course"),
+        ("about", r"about\s+(?:the\s+)?([A-Za-z][\w\s&\-:]+)"),
+    )
+)
+# Shortest query a title pattern can pull a 3+ character candidate from
+_MIN_TITLE_QUERY_LENGTH = len("about abc")
+_ARTICLE_PATTERN = re.compile(r"\b(the|a|an)\b", re.IGNORECASE)
+_TRAILING_PUNCT_PATTERN = re.compile(r"[?.!]+$")
+
+# Ollama structured-output schema for LLM fallback extraction; every field
+# is optional since a query rarely names all of them
+_EXTRACTION_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "course_code": {"type": "string"},
+        "course_title": {"type": "string"},
+        "lecturers": {"type": "array", "items": {"type": "string"}},
+    },
+}
+
 
 class EntityExtractor:
     """
@@ -38,7 +73,9 @@ class EntityExtractor:
     def __init__(
         self,
         catalog: MetadataCatalog,
-        extraction_llm: Optional[ChatOllama] = None
+        extraction_llm: Optional[ChatOllama] = None,
+        cache_size: int = 1024,
+        enable_llm_fallback: bool = True
     ):
         """
         Initialize entity extractor.
@@ -46,20 +83,57 @@ class EntityExtractor:
         Args:
             catalog: MetadataCatalog for validation
             extraction_llm: Optional LLM for fallback extraction
+            cache_size: Maximum number of memoized extraction results
+            enable_llm_fallback: Whether stage 5 may call the LLM
         """
         self.catalog = catalog
         self.extraction_llm = extraction_llm
+        self.enable_llm_fallback = enable_llm_fallback
+        self._extract_cached = lru_cache(maxsize=cache_size)(self._extract_frozen)
+        # lru_cache does not store raised exceptions, so a failed LLM call
+        # is retried on the next request instead of being memoized
+        self._llm_cached = lru_cache(maxsize=cache_size)(self._llm_entities)
 
     def extract(self, query: str) -> Dict[str, Any]:
         """
         Extract entities from query using multi-stage pipeline.
 
+        Results are memoized per whitespace-normalized query; callers get
+        a fresh dictionary on every call. Only successful LLM fallback
+        results are memoized.
+
         Args:
             query: User query string
 
         Returns:
             Dictionary with extracted entities
         """
+        normalized = " ".join(query.split())
+        extracted = {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in self._extract_cached(normalized)
+        }
+
+        # Stage 5: LLM extraction as fallback
+        if self._needs_llm(extracted):
+            self._llm_extraction(normalized, extracted)
+
+        return extracted
+
+    def clear_cache(self) -> None:
+        """Drop memoized results, e.g. after the catalog is rebuilt."""
+        self._extract_cached.cache_clear()
+        self._llm_cached.cache_clear()
+
+    def _extract_frozen(self, query: str) -> Tuple[Tuple[str, Any], ...]:
+        """Run the rule-based stages and freeze the result into a hashable tuple."""
+        return tuple(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in self._extract_impl(query).items()
+        )
+
+    def _extract_impl(self, query: str) -> Dict[str, Any]:
+        """Run the rule-based extraction stages (1-4)."""
         extracted: Dict[str, Any] = {}
 
         # Stage 1: Regex for course codes
@@ -76,15 +150,21 @@ class EntityExtractor:
         if is_comparison_query(query):
             self._extract_comparison_codes(query, extracted)
 
-        # Stage 5: LLM extraction as fallback
-        if self.extraction_llm and not extracted.get('course_code'):
-            self._llm_extraction(query, extracted)
-
         return extracted
 
+    def _needs_llm(self, extracted: Dict[str, Any]) -> bool:
+        """Whether the rule-based stages left anything for the LLM to find."""
+        return (
+            self.enable_llm_fallback
+            and self.extraction_llm is not None
+            and not extracted.get('course_code')
+            and not extracted.get('lecturers')
+            and not extracted.get('comparison_codes')
+        )
+
     def _extract_course_code(self, query: str, extracted: Dict[str, Any]) -> None:
         """Extract course code using regex."""
-        match = re.search(COURSE_CODE_REGEX, query.upper())
+        match = COURSE_CODE_PATTERN.search(query.upper())
         if match:
             code = match.group(0)
             if self.catalog.exists_code(code):
@@ -96,24 +176,25 @@ class EntityExtractor:
         """Extract course code by fuzzy matching title."""
         title_candidate = None
 
-        # Look for quoted text first
-        quote_match = re.search(r"'([^']+)'|\"([^\"]+)\"", query)
+        # Look for quoted text first; most queries have no quotes, so the
+        # membership test spares the alternation regex in the common case
+        quote_match = None
+        if "'" in query or '"' in query:
+            quote_match = _QUOTED_PATTERN.search(query)
         if quote_match:
             title_candidate = (quote_match.group(1) or quote_match.group(2) or "").strip()
-        else:
-            # Multiple patterns to search for title
-            patterns = [
-                r"(?:course)\s+([A-Za-z][\w\s&\-:]+)",
-                r"([A-Za-z][\w\s&\-:]+)\s+course",
-                r"for\s+(?:the\s+)?([A-Za-z][\w\s&\-:]+)\s+course",
-                r"about\s+(?:the\s+)?([A-Za-z][\w\s&\-:]+)",
-            ]
-
-            for pattern in patterns:
-                match = re.search(pattern, query, flags=re.IGNORECASE)
+        elif len(query) >= _MIN_TITLE_QUERY_LENGTH:
+            # Multiple patterns to search for title. Input is capped at
+            # MAX_QUERY_LENGTH to bound the worst-case backtracking cost.
+            text = query[:MAX_QUERY_LENGTH]
+            text_lower = text.lower()
+            for keyword, pattern in _TITLE_PATTERNS:
+                if keyword not in text_lower:
+                    continue
+                match = pattern.search(text)
                 if match:
                     candidate = match.group(1).strip()
-                    candidate = re.sub(r'\b(the|a|an)\b', '', candidate, flags=re.IGNORECASE).strip()
+                    candidate = _ARTICLE_PATTERN.sub('', candidate).strip()
                     if len(candidate) > 2:
                         title_candidate = candidate
                         break
@@ -141,28 +222,22 @@ class EntityExtractor:
 
         # Separate direct codes from potential titles
         for candidate in candidates:
-            if re.fullmatch(COURSE_CODE_REGEX, candidate.upper()):
+            if COURSE_CODE_PATTERN.fullmatch(candidate.upper()):
                 if self.catalog.exists_code(candidate.upper()):
                     codes.append(candidate.upper())
             else:
                 titles_left.append(candidate)
 
-        # Fuzzy match remaining titles
-        for title in titles_left:
-            title_clean = re.sub(r"[?.!]+$", "", title).strip()
-            fuzzy_match = self.catalog.fuzzy_title_to_code(title_clean, cutoff=0.78)
+        # Fuzzy match remaining titles in one batch
+        titles_clean = [_TRAILING_PUNCT_PATTERN.sub("", title).strip() for title in titles_left]
+        for fuzzy_match in self.catalog.fuzzy_titles_to_codes(titles_clean, cutoff=0.78):
             if fuzzy_match:
                 code, _ = fuzzy_match
                 codes.append(code)
 
         # Additional substring matching if needed
         if len(codes) < 2:
-            query_lower = query.lower()
-            for title in self.catalog.titles_set:
-                if title and title.lower() in query_lower:
-                    for code, catalog_title in self.catalog.codes_to_titles.items():
-                        if catalog_title.lower() == title.lower():
-                            codes.append(code)
+            codes.extend(self.catalog.codes_with_title_in(query))
 
         # Remove duplicates while preserving order
         seen_codes: Set[str] = set()
@@ -182,35 +257,69 @@ class EntityExtractor:
             return
 
         try:
-            response = self.extraction_llm.invoke(
-                f"Extract ONLY from this query: '{query}' as JSON."
-            )
-            data = json.loads(response.content) if isinstance(response.content, str) else response.content
-
-            if isinstance(data, dict):
-                llm_code = (data.get('course_code') or "").strip().upper()
-                llm_title = (data.get('course_title') or "").strip()
-                llm_lecturers = data.get('lecturers') or []
-
-                # Use LLM lecturers if not already extracted
-                if llm_lecturers and not extracted.get('lecturers'):
-                    if isinstance(llm_lecturers, list):
-                        extracted['lecturers'] = [str(x).strip() for x in llm_lecturers if str(x).strip()]
-                    elif isinstance(llm_lecturers, str) and llm_lecturers.strip():
-                        extracted['lecturers'] = [llm_lecturers.strip()]
-
-                # Use LLM course code if verified
-                if 'course_code' not in extracted and llm_code and self.catalog.exists_code(llm_code):
-                    extracted['course_code'] = llm_code
-                    extracted['course_title'] = self.catalog.get_title(llm_code)
-                    logger.info(f"[Extract] Using LLM course_code verified in catalog: {llm_code}")
-                elif 'course_code' not in extracted and llm_title:
-                    fuzzy_match = self.catalog.fuzzy_title_to_code(llm_title, cutoff=0.80)
-                    if fuzzy_match:
-                        code, score = fuzzy_match
-                        extracted['course_code'] = code
-                        extracted['course_title'] = self.catalog.get_title(code)
-                        logger.info(f"[Extract] LLM title fuzzy-mapped → {code} (score={score:.2f})")
-
+            data = self._llm_cached(query)
         except Exception as e:
             logger.warning(f"[Extract] LLM extraction failed: {e}")
+            return
+
+        if data is None:
+            return
+
+        llm_code, llm_title, llm_lecturers = data
+
+        # Use LLM lecturers if not already extracted
+        if llm_lecturers is not None and not extracted.get('lecturers'):
+            extracted['lecturers'] = list(llm_lecturers)
+
+        # Use LLM course code if verified
+        if 'course_code' not in extracted and llm_code and self.catalog.exists_code(llm_code):
+            extracted['course_code'] = llm_code
+            extracted['course_title'] = self.catalog.get_title(llm_code)
+            logger.info(f"[Extract] Using LLM course_code verified in catalog: {llm_code}")
+        elif 'course_code' not in extracted and llm_title:
+            fuzzy_match = self.catalog.fuzzy_title_to_code(llm_title, cutoff=0.80)
+            if fuzzy_match:
+                code, score = fuzzy_match
+                extracted['course_code'] = code
+                extracted['course_title'] = self.catalog.get_title(code)
+                logger.info(f"[Extract] LLM title fuzzy-mapped → {code} (score={score:.2f})")
+
+    def _llm_entities(
+        self,
+        query: str
+    ) -> Optional[Tuple[str, str, Optional[Tuple[str, ...]]]]:
+        """
+        Ask the LLM for entities and normalize its reply.
+
+        Raises on a failed call or unparsable reply, so the memoizing
+        wrapper only keeps successful results.
+
+        Returns:
+            Tuple of (course code, course title, lecturers or None), or
+            None when the reply is not a JSON object
+        """
+        response = self.extraction_llm.invoke(
+            f"Extract ONLY from this query: '{query}' as JSON.",
+            format=_EXTRACTION_SCHEMA
+        )
+        content = response.content
+        if isinstance(content, str):
+            data = orjson.loads(content) if orjson is not None else json.loads(content)
+        else:
+            data = content
+
+        if not isinstance(data, dict):
+            return None
+
+        llm_code = (data.get('course_code') or "").strip().upper()
+        llm_title = (data.get('course_title') or "").strip()
+        llm_lecturers = data.get('lecturers') or []
+
+        lecturers: Optional[Tuple[str, ...]] = None
+        if llm_lecturers:
+            if isinstance(llm_lecturers, list):
+                lecturers = tuple(str(x).strip() for x in llm_lecturers if str(x).strip())
+            elif isinstance(llm_lecturers, str) and llm_lecturers.strip():
+                lecturers = (llm_lecturers.strip(),)
+
+        return llm_code, llm_title, lecturers
@@ -5,16 +5,21 @@ LLM-based answer generation with specialized modes.
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
 from langchain_core.documents import Document
 from langchain_ollama import ChatOllama
 
-from utils.query_analysis import is_lecturer_query, is_comparison_query, lecturer_matches
+from utils.query_analysis import classify_query, lecturer_matches
 
 logger = logging.getLogger(__name__)
 
 
+class GenerationError(RuntimeError):
+    """Raised when the LLM fails while answering; the message is user-facing."""
+
+
 class AnswerGenerator:
     """
     LLM-based answer generation with specialized modes.
@@ -25,14 +30,26 @@ class AnswerGenerator:
     - lecturer: Deterministic lecturer query responses
     """
 
-    def __init__(self, llm: ChatOllama):
+    def __init__(
+        self,
+        llm: ChatOllama,
+        parallel_comparison: bool = False,
+        max_comparison_workers: int = 8
+    ):
         """
         Initialize answer generator.
 
         Args:
             llm: ChatOllama instance for generation
+            parallel_comparison: Summarize each compared course with its own
+                concurrent LLM call, then synthesize, instead of one large
+                comparison prompt (pays off when Ollama serves parallel
+                requests, e.g. OLLAMA_NUM_PARALLEL > 1)
+            max_comparison_workers: Maximum concurrent per-course calls
         """
         self.llm = llm
+        self.parallel_comparison = parallel_comparison
+        self.max_comparison_workers = max_comparison_workers
 
     def generate(
         self,
@@ -52,52 +69,67 @@ class AnswerGenerator:
 
         Returns:
             Generated answer string
-        """
-        if not mode:
-            mode = self.determine_mode(query, extracted)
 
-        if mode == "lecturer":
-            return self._generate_lecturer_answer(query, documents, extracted)
-        elif mode == "comparison":
-            return self._generate_comparison_answer(query, documents, extracted)
-        else:
-            return self._generate_standard_answer(query, documents)
-
-    def determine_mode(self, query: str, extracted: Dict[str, Any]) -> str:
-        """Determine the appropriate generation mode."""
-        if is_lecturer_query(query):
-            return "lecturer"
-        if is_comparison_query(query) or extracted.get("comparison_codes"):
-            return "comparison"
-        return "standard"
+        Raises:
+            GenerationError: If the LLM call fails
+        """
+        return "".join(self.generate_stream(query, documents, extracted, mode)).strip()
 
-    def _generate_standard_answer(
+    def generate_stream(
         self,
         query: str,
-        documents: List[Document]
-    ) -> str:
-        """Generate standard answer from context."""
-        if not documents:
-            return "I don't have enough information to answer this question."
+        documents: List[Document],
+        extracted: Dict[str, Any],
+        mode: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Generate an answer incrementally, yielding text chunks as the LLM
+        produces them.
 
-        context = self._build_context(documents)
+        Args:
+            query: User query
+            documents: Context documents
+            extracted: Extracted entities
+            mode: Generation mode (auto-detected if None)
 
-        prompt = f"""Based on the following course information, answer the question.
-Be specific and cite course details when possible.
+        Yields:
+            Answer text chunks
 
-Context:
-{context}
-
-Question: {query}
+        Raises:
+            GenerationError: If the LLM call fails, so callers can mark the
+                response as an error instead of caching the apology
+        """
+        if not mode:
+            mode = self.determine_mode(query, extracted)
 
-Answer:"""
+        if mode == "lecturer":
+            yield self._generate_lecturer_answer(query, documents, extracted)
+            return
+
+        if mode == "comparison" and len(extracted.get("comparison_codes", [])) >= 2:
+            prompt = self._build_comparison_prompt(query, documents, extracted["comparison_codes"])
+            error_message = "Sorry, I encountered an error generating the comparison."
+        elif documents:
+            prompt = self._standard_prompt(query, documents)
+            error_message = "Sorry, I encountered an error generating the answer."
+        else:
+            yield "I don't have enough information to answer this question."
+            return
 
         try:
-            response = self.llm.invoke(prompt)
-            return response.content.strip()
+            for chunk in self.llm.stream(prompt):
+                if chunk.content:
+                    yield chunk.content
         except Exception as e:
-            logger.error(f"Generation failed: {e}")
-            return "Sorry, I encountered an error generating the answer."
+            logger.error(f"Streaming generation failed: {e}")
+            raise GenerationError(error_message) from e
+
+    def determine_mode(self, query: str, extracted: Dict[str, Any]) -> str:
+        """Determine the appropriate generation mode."""
+        mode = classify_query(query)
+        if mode == "standard" and extracted.get("comparison_codes"):
+            return "comparison"
+        return mode
 
     def _generate_lecturer_answer(
         self,
@@ -125,10 +157,10 @@ Answer:"""
         # Extract unique courses
         courses = {}
         for doc in matching_docs:
-            code = (doc.metadata or {}).get("course_code", "")
-            title = (doc.metadata or {}).get("course_title", "")
-            if code and code not in courses:
-                courses[code] = title
+            metadata = doc.metadata or {}
+            code = metadata.get("course_code", "")
+            if code:
+                courses.setdefault(code, metadata.get("course_title", ""))
 
         if not courses:
             return f"I found documents mentioning '{lecturers[0]}' but couldn't extract specific course information."
@@ -144,20 +176,128 @@ Answer:"""
 
 Found {len(courses)} course(s) in the database."""
 
-    def _generate_comparison_answer(
+    def _standard_prompt(self, query: str, documents: List[Document]) -> str:
+        """Build the prompt for standard answers."""
+        context = self._build_context(documents)
+
+        return f"""Based on the following course information, answer the question.
+Be specific and cite course details when possible.
+
+Context:
+{context}
+
+Question: {query}
+
+Answer:"""
+
+    def _build_comparison_prompt(
         self,
         query: str,
         documents: List[Document],
-        extracted: Dict[str, Any]
+        comparison_codes: List[str]
     ) -> str:
-        """Generate structured comparison answer."""
-        comparison_codes = extracted.get("comparison_codes", [])
+        """Build the comparison prompt for the configured strategy."""
+        if self.parallel_comparison:
+            return self._synthesis_prompt(
+                query, self._summarize_courses(query, documents, comparison_codes)
+            )
+        return self._comparison_prompt(query, documents, comparison_codes)
+
+    def _comparison_prompt(
+        self,
+        query: str,
+        documents: List[Document],
+        comparison_codes: List[str]
+    ) -> str:
+        """Build the prompt for structured comparisons."""
+        context = "\n\n---\n\n".join(
+            f"## {title} ({code})\n{content}"
+            for code, title, content in self._course_contexts(documents, comparison_codes)
+        )
+
+        return f"""Compare the following courses based on the user's question.
+Provide a structured comparison highlighting key differences and similarities.
+
+{context}
+
+Question: {query}
+
+Comparison:"""
+
+    def _summarize_courses(
+        self,
+        query: str,
+        documents: List[Document],
+        comparison_codes: List[str]
+    ) -> List[Tuple[str, str, str]]:
+        """
+        Summarize each compared course with concurrent LLM calls.
+
+        A failed call falls back to a neutral placeholder so one course does
+        not sink the whole comparison.
+
+        Returns:
+            (code, title, summary) tuples in comparison order
+        """
+        courses = self._course_contexts(documents, comparison_codes)
+        if not courses:
+            return []
+
+        summaries: Dict[str, str] = {}
+        workers = min(self.max_comparison_workers, len(courses))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    self.llm.invoke,
+                    self._course_summary_prompt(query, title, code, content)
+                ): code
+                for code, title, content in courses
+            }
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    summaries[code] = future.result().content.strip()
+                except Exception as e:
+                    logger.warning(f"Course summary failed for {code}: {e}")
+                    summaries[code] = "No information available for this course."
+
+        return [(code, title, summaries[code]) for code, title, _ in courses]
+
+    @staticmethod
+    def _course_summary_prompt(query: str, title: str, code: str, content: str) -> str:
+        """Build the per-course summary prompt for parallel comparisons."""
+        return f"""Summarize the following course information as it relates to the user's question.
+Be concise and keep concrete details (prerequisites, assessment, contents, outcomes).
+
+## {title} ({code})
+{content}
+
+Question: {query}
+
+Summary:"""
 
-        if len(comparison_codes) < 2:
-            # Fall back to standard if not enough courses
-            return self._generate_standard_answer(query, documents)
+    @staticmethod
+    def _synthesis_prompt(query: str, summaries: List[Tuple[str, str, str]]) -> str:
+        """Build the final comparison prompt from per-course summaries."""
+        context = "\n\n---\n\n".join(
+            f"## {title} ({code})\n{summary}" for code, title, summary in summaries
+        )
 
-        # Group documents by course
+        return f"""Compare the following courses based on the user's question, using the course summaries below.
+Provide a structured comparison highlighting key differences and similarities.
+
+{context}
+
+Question: {query}
+
+Comparison:"""
+
+    @staticmethod
+    def _course_contexts(
+        documents: List[Document],
+        comparison_codes: List[str]
+    ) -> List[Tuple[str, str, str]]:
+        """Group documents by course into (code, title, content) tuples."""
         docs_by_course: Dict[str, List[Document]] = {code: [] for code in comparison_codes}
 
         for doc in documents:
@@ -165,35 +305,18 @@ Found {len(courses)} course(s) in the database."""
             if code in docs_by_course:
                 docs_by_course[code].append(doc)
 
-        # Build comparison context
-        context_parts = []
+        courses = []
         for code in comparison_codes:
             course_docs = docs_by_course.get(code, [])
             if course_docs:
                 title = (course_docs[0].metadata or {}).get("course_title", code)
-                doc_content = "\n".join([
+                content = "\n".join([
                     f"[{(d.metadata or {}).get('section_title', 'Section')}]: {d.page_content[:500]}"
                     for d in course_docs[:3]
                 ])
-                context_parts.append(f"## {title} ({code})\n{doc_content}")
-
-        context = "\n\n---\n\n".join(context_parts)
-
-        prompt = f"""Compare the following courses based on the user's question.
-Provide a structured comparison highlighting key differences and similarities.
-
-{context}
+                courses.append((code, title, content))
 
-Question: {query}
-
-Comparison:"""
-
-        try:
-            response = self.llm.invoke(prompt)
-            return response.content.strip()
-        except Exception as e:
-            logger.error(f"Comparison generation failed: {e}")
-            return "Sorry, I encountered an error generating the comparison."
+        return courses
 
     def _build_context(self, documents: List[Document], max_length: int = 4000) -> str:
         """Build context string from documents."""
@@ -5,14 +5,35 @@ Cross-encoder based reranking with metadata integration.
 """
 
 import logging
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 
+import numpy as np
+import torch
 from langchain_core.documents import Document
 from sentence_transformers import CrossEncoder
 
 logger = logging.getLogger(__name__)
 
 
+def _top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, sorted descending.
+
+    Partitions first so only candidates at or above the k-th score are
+    sorted. The sort is stable, so ties keep retrieval order exactly as a
+    full stable sort would.
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    order = np.argsort(-scores[candidates], kind="stable")
+    return candidates[order[:k]]
+
+
 class DocumentReranker:
     """
     Cross-encoder based document reranking.
@@ -21,22 +42,71 @@ class DocumentReranker:
     retrieved documents for improved relevance.
     """
 
-    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        backend: str = "torch",
+        model_kwargs: Optional[Dict[str, Any]] = None,
+        torch_dtype: Optional[str] = None,
+        batch_size: int = 64,
+        max_text_chars: int = 1800,
+        num_threads: Optional[int] = None,
+        warmup: bool = True
+    ):
         """
         Initialize document reranker.
 
         Args:
             model_name: Cross-encoder model name
+            backend: Inference backend ("torch", "onnx" or "openvino")
+            model_kwargs: Optional backend model arguments, e.g.
+                {"file_name": "onnx/model_O4.onnx"} to pick an optimized or
+                quantized export published in the model repo
+            torch_dtype: Optional weight dtype for the torch backend, e.g.
+                "bfloat16" on CPUs/GPUs with native bf16 support
+            batch_size: Maximum pairs per forward pass
+            max_text_chars: Document text cap (~450 tokens), so one long
+                outlier does not pad the whole batch to the model maximum
+            num_threads: Optional torch intra-op thread count, to avoid
+                oversubscription when several requests rerank at once
+            warmup: Run one dummy prediction so the first query does not
+                pay for lazy weight loading and kernel selection
         """
-        logger.info(f"Initializing Cross-Encoder: {model_name}")
-        self.cross_encoder = CrossEncoder(model_name)
+        self.batch_size = batch_size
+        self.max_text_chars = max_text_chars
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # Only allowed before any inter-op parallel work has started
+                logger.debug("torch inter-op thread count already fixed")
+
+        logger.info(f"Initializing Cross-Encoder: {model_name} (backend={backend})")
+        encoder_kwargs: Dict[str, Any] = {}
+        if backend != "torch":
+            # Only passed when needed so older sentence-transformers still load
+            encoder_kwargs["backend"] = backend
+        model_kwargs = dict(model_kwargs or {})
+        if torch_dtype and backend == "torch":
+            # Native low-precision weights halve weight traffic per forward
+            model_kwargs["torch_dtype"] = getattr(torch, torch_dtype)
+        if model_kwargs:
+            encoder_kwargs["model_kwargs"] = model_kwargs
+        self.cross_encoder = CrossEncoder(model_name, **encoder_kwargs)
+
+        if warmup:
+            self.cross_encoder.predict([("warmup", "warmup")], batch_size=1, show_progress_bar=False)
+
         logger.info("Cross-Encoder initialized successfully")
 
     def rerank(
         self,
         query: str,
         documents: List[Document],
-        top_k: int = 5
+        top_k: int = 5,
+        shallow_k: Optional[int] = None
     ) -> Tuple[List[Document], List[float]]:
         """
         Rerank documents using cross-encoder.
@@ -45,6 +115,8 @@ class DocumentReranker:
             query: Search query
             documents: Documents to rerank
             top_k: Number of top documents to return
+            shallow_k: Optional window; only the first max(shallow_k, top_k)
+                retrieved documents are cross-encoded and the tail is dropped
 
         Returns:
             Tuple of (reranked documents, scores)
@@ -52,26 +124,48 @@ class DocumentReranker:
         if not documents:
             return [], []
 
-        # Create query-document pairs with enriched text
-        pairs = [(query, self._doc_to_rerank_text(doc)) for doc in documents]
-
-        # Get scores from cross-encoder
-        scores = self.cross_encoder.predict(pairs)
+        if shallow_k:
+            documents = documents[:max(shallow_k, top_k)]
 
-        # Create scored tuples and sort by score descending
-        scored_docs = list(zip(scores, documents))
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
+        scores = self._score(query, documents)
 
-        # Take top k
-        top_docs = scored_docs[:top_k]
+        # Indices of the top k scores, best first
+        top_idx = _top_k_indices(scores, top_k)
 
-        reranked_docs = [doc for _, doc in top_docs]
-        rerank_scores = [float(score) for score, _ in top_docs]
+        reranked_docs = [documents[i] for i in top_idx]
+        rerank_scores = scores[top_idx].tolist()
 
         logger.info(f"Reranked {len(documents)} docs, kept top {len(reranked_docs)}")
 
         return reranked_docs, rerank_scores
 
+    def _score(self, query: str, documents: List[Document]) -> np.ndarray:
+        """
+        Score query-document pairs with the cross-encoder.
+
+        Up to batch_size pairs go through a single batch, so typical
+        candidate sets are tokenized in one call and run in one forward pass.
+
+        Args:
+            query: Search query
+            documents: Documents to score
+
+        Returns:
+            float32 scores aligned with documents
+        """
+        pairs = [
+            (query, self._doc_to_rerank_text(doc)[:self.max_text_chars])
+            for doc in documents
+        ]
+        scores = self.cross_encoder.predict(
+            pairs,
+            batch_size=min(len(pairs), self.batch_size),
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        # Sort in float32 even when the model runs in reduced precision
+        return np.asarray(scores, dtype=np.float32)
+
     @staticmethod
     def _doc_to_rerank_text(doc: Document) -> str:
         """
@@ -111,10 +205,7 @@ class DocumentReranker:
         if not documents:
             return []
 
-        pairs = [(query, self._doc_to_rerank_text(doc)) for doc in documents]
-        scores = self.cross_encoder.predict(pairs)
-
-        scored_docs = list(zip(scores, documents))
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
+        scores = self._score(query, documents)
+        order = np.argsort(-scores, kind="stable")
 
-        return [(float(s), d) for s, d in scored_docs]
+        return list(zip(scores[order].tolist(), (documents[i] for i in order)))
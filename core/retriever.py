@@ -4,14 +4,19 @@ Vector Retrieval Module
 Vector search with MMR and metadata filtering.
 """
 
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 
 from langchain_core.documents import Document
-from langchain_core.vectorstores import VectorStore
+from langchain_core.vectorstores import VectorStore, VectorStoreRetriever
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on distinct (search_type, kwargs) retrievers kept alive
+MAX_CACHED_RETRIEVERS = 256
+
 
 class VectorRetriever:
     """
@@ -39,6 +44,9 @@ class VectorRetriever:
         self.default_k = default_k
         self.lecturer_k = lecturer_k
 
+        self._retrievers: Dict[Tuple[str, str], VectorStoreRetriever] = {}
+        self._retrievers_lock = threading.Lock()
+
     def search(
         self,
         query: str,
@@ -70,10 +78,7 @@ class VectorRetriever:
         logger.info(f"Searching with query='{query[:50]}...', k={k}, filters={filters}")
 
         try:
-            retriever = self.vectorstore.as_retriever(
-                search_type=search_type,
-                search_kwargs=search_kwargs
-            )
+            retriever = self._get_retriever(search_type, search_kwargs)
             return retriever.invoke(query)
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
@@ -109,6 +114,9 @@ class VectorRetriever:
         """
         Fetch documents using filters only with neutral query.
 
+        List values match any of their items (``$in``), so several
+        codes/sections can be fetched in a single round-trip.
+
         Args:
             filter_dict: Metadata filters
             k: Number of documents to retrieve
@@ -117,16 +125,45 @@ class VectorRetriever:
             List of filtered documents
         """
         try:
-            and_filter = {'$and': [{field: value} for field, value in filter_dict.items()]}
-            retriever = self.vectorstore.as_retriever(
-                search_type="mmr",
-                search_kwargs={'k': k, 'filter': and_filter}
+            clauses = [
+                {field: {'$in': value} if isinstance(value, list) else value}
+                for field, value in filter_dict.items()
+            ]
+            # Chroma rejects a single-clause $and
+            where = clauses[0] if len(clauses) == 1 else {'$and': clauses}
+            retriever = self._get_retriever(
+                "mmr",
+                {'k': k, 'fetch_k': max(k, 20), 'filter': where}
             )
             return retriever.invoke(" ")  # Neutral query
         except Exception as e:
             logger.error(f"Filter-only fetch failed: {e}")
             return []
 
+    def _get_retriever(
+        self,
+        search_type: str,
+        search_kwargs: Dict[str, Any]
+    ) -> VectorStoreRetriever:
+        """
+        Get a retriever for the search settings, building it on first use.
+
+        Retrievers are stateless wrappers around the vector store, so one
+        instance per distinct (search_type, search_kwargs) is reused.
+        """
+        key = (search_type, json.dumps(search_kwargs, sort_keys=True, default=str))
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            retriever = self.vectorstore.as_retriever(
+                search_type=search_type,
+                search_kwargs=search_kwargs
+            )
+            with self._retrievers_lock:
+                if len(self._retrievers) >= MAX_CACHED_RETRIEVERS:
+                    self._retrievers.clear()
+                self._retrievers[key] = retriever
+        return retriever
+
     def _process_filters(self, filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Process and validate metadata filters for ChromaDB.
@@ -4,11 +4,17 @@ PDF Data Extractor
 Extracts structured course information from PDF files.
 """
 
+import io
 import os
 import re
 import json
 import logging
-from typing import List, Dict, Any
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import List, Dict, Any, DefaultDict, Iterator, Optional, Union, BinaryIO
+
+import numpy as np
 
 try:
     import fitz  # PyMuPDF
@@ -51,6 +57,21 @@ FIELD_PATTERNS = {
     "credit_required_for_degree": r"Credit required to obtain degree:\s*(.+)"
 }
 
+# Patterns compiled once at import. Fields keep one search each: every pattern
+# starts with a literal label the regex engine scans for quickly, which beats
+# a single fused alternation over the whole text.
+_FIELD_REGEXES = tuple((key, re.compile(pattern)) for key, pattern in FIELD_PATTERNS.items())
+_YEAR_RANGE_RE = re.compile(r"^\d{4}\s*-\s*\d{4}$")
+_EXAMPERIOD_LINE_RE = re.compile(r"(?m)^Examperiod:")
+_MATRICULA_RE = re.compile(r"^M\d{7}")
+_LECTURER_LINE_RE = re.compile(r"^[TCM]\s+(.+)")
+_X0 = itemgetter("x0")
+# One heading alternation per line; group i+1 matches SECTION_HEADINGS[i]
+_SECTION_HEADING_RE = re.compile(
+    r"(?:\d+\.\s*)?(?:" + "|".join(f"({re.escape(h)})" for h in SECTION_HEADINGS) + r")\b",
+    re.IGNORECASE
+)
+
 
 class PDFDataExtractor:
     """
@@ -68,7 +89,7 @@ class PDFDataExtractor:
         """Extract course title from text."""
         for line in text.splitlines():
             line = line.strip()
-            if not line or re.match(r"^\d{4}\s*-\s*\d{4}$", line):
+            if not line or _YEAR_RANGE_RE.match(line):
                 continue
             return line
         return ""
@@ -76,8 +97,8 @@ class PDFDataExtractor:
     def extract_key_fields(self, text: str) -> Dict[str, Any]:
         """Extract key course fields using regex patterns."""
         fields = {}
-        for key, pattern in FIELD_PATTERNS.items():
-            match = re.search(pattern, text)
+        for key, pattern in _FIELD_REGEXES:
+            match = pattern.search(text)
             if match:
                 fields[key] = match.group(1).strip()
         return fields
@@ -89,28 +110,47 @@ class PDFDataExtractor:
             return []
 
         snippet = text[start + len("Lecturer(s):"):]
-        end = re.search(r"(?m)^Examperiod:", snippet)
+        end = _EXAMPERIOD_LINE_RE.search(snippet)
         block = snippet[:end.start()] if end else snippet
 
         names = []
         for line in block.splitlines():
             line = line.strip()
-            if not line or line.startswith("-") or line.lower().startswith("http"):
+            if not line or line[0] == "-" or line[:4].lower() == "http":
                 continue
-            if re.match(r"^M\d{7}", line):
+            if _MATRICULA_RE.match(line):
                 continue
 
-            match = re.match(r'^[TCM]\s+(.+)', line)
+            match = _LECTURER_LINE_RE.match(line)
             if match:
                 names.append(match.group(1).strip())
 
         return names
 
-    def extract_non_table_text(self, pdf_path: str) -> str:
-        """Extract text excluding table content."""
-        def in_bbox(x, y, bbox):
-            return bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
-
+    @staticmethod
+    def _words_outside_bboxes(
+        words: List[Dict[str, Any]],
+        bboxes: List[tuple]
+    ) -> List[Dict[str, Any]]:
+        """Drop words whose center lies inside any of the bounding boxes."""
+        if not bboxes or not words:
+            return list(words)
+
+        # (words x tables) containment mask in one vectorized pass; float64
+        # keeps boundary comparisons identical to scalar Python floats
+        n = len(words)
+        cx = np.fromiter(((w["x0"] + w["x1"]) / 2 for w in words), np.float64, n)[:, None]
+        cy = np.fromiter(((w["top"] + w["bottom"]) / 2 for w in words), np.float64, n)[:, None]
+        boxes = np.asarray(bboxes, dtype=np.float64)
+        inside = (
+            (boxes[:, 0] <= cx) & (cx <= boxes[:, 2]) &
+            (boxes[:, 1] <= cy) & (cy <= boxes[:, 3])
+        )
+        keep_mask = ~inside.any(axis=1)
+        return [w for w, keep in zip(words, keep_mask.tolist()) if keep]
+
+    def extract_non_table_text(self, pdf_path: Union[str, BinaryIO]) -> str:
+        """Extract text excluding table content from a PDF path or binary stream."""
         lines = []
         with pdfplumber.open(pdf_path) as pdf:
             for page in pdf.pages:
@@ -118,28 +158,26 @@ class PDFDataExtractor:
                 words = page.extract_words()
 
                 # Filter out words inside tables
-                keep = [
-                    w for w in words
-                    if not any(
-                        in_bbox((w["x0"] + w["x1"]) / 2, (w["top"] + w["bottom"]) / 2, b)
-                        for b in bboxes
-                    )
-                ]
-
-                # Sort by position
-                keep.sort(key=lambda w: (round(w["top"]), w["x0"]))
-
-                # Group into lines
-                buffer, current_y = [], None
+                keep = self._words_outside_bboxes(words, bboxes)
+
+                # Bucket words by rounded top; only the distinct rows need a
+                # global sort, and each row is sorted by x0 on its own
+                rows: DefaultDict[int, List[Dict[str, Any]]] = defaultdict(list)
                 for w in keep:
-                    y = round(w["top"])
+                    rows[round(w["top"])].append(w)
+
+                # Group rows into lines
+                buffer, current_y = [], None
+                for y in sorted(rows):
+                    row = rows[y]
+                    row.sort(key=_X0)
+                    texts = [w["text"] for w in row]
                     if current_y is None or abs(y - current_y) <= 3:
-                        buffer.append(w["text"])
-                        current_y = y
+                        buffer.extend(texts)
                     else:
                         lines.append(" ".join(buffer))
-                        buffer = [w["text"]]
-                        current_y = y
+                        buffer = texts
+                    current_y = y
 
                 if buffer:
                     lines.append(" ".join(buffer))
@@ -148,24 +186,17 @@ class PDFDataExtractor:
 
     def split_description_sections(self, description: str) -> Dict[str, str]:
         """Split description into sections."""
-        patterns = {
-            h: re.compile(rf"(?mi)^(?:\d+\.\s*)?{re.escape(h)}\b", re.IGNORECASE)
-            for h in SECTION_HEADINGS
-        }
-
-        sections = {h: "" for h in SECTION_HEADINGS}
+        sections: Dict[str, List[str]] = {h: [] for h in SECTION_HEADINGS}
         current = None
 
         for line in description.splitlines():
-            for heading, pattern in patterns.items():
-                if pattern.match(line):
-                    current = heading
-                    break
-            else:
-                if current:
-                    sections[current] += line + "\n"
+            match = _SECTION_HEADING_RE.match(line)
+            if match:
+                current = SECTION_HEADINGS[match.lastindex - 1]
+            elif current:
+                sections[current].append(line)
 
-        return {h: sections[h].strip() for h in SECTION_HEADINGS}
+        return {h: "\n".join(sections[h]).strip() for h in SECTION_HEADINGS}
 
     def process_pdf(self, pdf_path: str) -> Dict[str, Any]:
         """
@@ -179,8 +210,12 @@ class PDFDataExtractor:
         """
         logger.info(f"Processing: {pdf_path}")
 
+        # Read the file once; both parsers work from the same bytes
+        with open(pdf_path, "rb") as f:
+            pdf_bytes = f.read()
+
         # Read full text with PyMuPDF
-        doc = fitz.open(pdf_path)
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
         full_text = "".join(page.get_text() for page in doc)
         doc.close()
 
@@ -189,7 +224,7 @@ class PDFDataExtractor:
         details["lecturers"] = self.extract_lecturer_names(full_text)
 
         # Extract non-table text for description
-        non_table_text = self.extract_non_table_text(pdf_path)
+        non_table_text = self.extract_non_table_text(io.BytesIO(pdf_bytes))
 
         return {
             "file_name": os.path.basename(pdf_path),
@@ -199,28 +234,64 @@ class PDFDataExtractor:
             "course_description": non_table_text
         }
 
-    def process_directory(self, input_dir: str) -> List[Dict[str, Any]]:
+    def process_directory(
+        self,
+        input_dir: str,
+        max_workers: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Process all PDFs in a directory.
 
         Args:
             input_dir: Directory containing PDF files
+            max_workers: Worker processes (defaults to the CPU count; 1 runs
+                sequentially in this process)
 
         Returns:
-            List of extracted course data
+            List of extracted course data, in directory listing order
         """
-        results = []
+        results = list(self.iter_directory(input_dir, max_workers=max_workers))
+        logger.info(f"Processed {len(results)} PDFs")
+        return results
 
-        for filename in os.listdir(input_dir):
-            if not filename.lower().endswith(".pdf"):
-                continue
+    def iter_directory(
+        self,
+        input_dir: str,
+        max_workers: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield extracted course data for each PDF in a directory.
 
-            full_path = os.path.join(input_dir, filename)
-            try:
-                result = self.process_pdf(full_path)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Failed to process {filename}: {e}")
+        Files are independent and parsing is CPU-bound pure Python, so they
+        are processed in a pool of worker processes. Results are yielded as
+        soon as they are ready in listing order, so callers can write them
+        out without holding the whole corpus.
 
-        logger.info(f"Processed {len(results)} PDFs")
-        return results
+        Args:
+            input_dir: Directory containing PDF files
+            max_workers: Worker processes (defaults to the CPU count; 1 runs
+                sequentially in this process)
+
+        Yields:
+            Extracted course data, in directory listing order
+        """
+        filenames = [f for f in os.listdir(input_dir) if f.lower().endswith(".pdf")]
+        paths = [os.path.join(input_dir, f) for f in filenames]
+        max_workers = min(max_workers or os.cpu_count() or 1, len(paths) or 1)
+
+        if max_workers == 1:
+            for filename, full_path in zip(filenames, paths):
+                try:
+                    yield self.process_pdf(full_path)
+                except Exception as e:
+                    logger.error(f"Failed to process {filename}: {e}")
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self.process_pdf, path) for path in paths]
+                for filename, future in zip(filenames, futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to process {filename}: {e}")
+                        continue
+                    yield result
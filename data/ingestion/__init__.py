@@ -5,10 +5,12 @@ Provides document chunking and vector store management.
 """
 
 from .chunker import AdvancedAcademicChunker
+from .course_loader import iter_courses
 from .vector_store import LangChainVectorStoreManager, CrossEncoderReRanker
 
 __all__ = [
     "AdvancedAcademicChunker",
     "LangChainVectorStoreManager",
     "CrossEncoderReRanker",
+    "iter_courses",
 ]
@@ -4,8 +4,9 @@ Advanced Academic Chunker
 Specialized document chunking for academic course data.
 """
 
+import sys
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -70,6 +71,12 @@ class AdvancedAcademicChunker:
             "lecturers": ", ".join(details.get("lecturers", [])),
             "file_name": course_data.get("file_name", "N/A")
         }
+        # Values such as language, semester and "N/A" repeat across courses;
+        # chunk metadata copies share the base values by reference already
+        base_metadata = {
+            key: sys.intern(value) if isinstance(value, str) else value
+            for key, value in base_metadata.items()
+        }
 
         # Create summary document
         summary_doc = self._create_summary_document(base_metadata)
@@ -84,11 +91,6 @@ class AdvancedAcademicChunker:
                 continue
 
             content_len = len(content)
-            header = (
-                f"Regarding the course '{base_metadata['course_title']}' "
-                f"({base_metadata['course_code']}). "
-                f"This section describes '{section_title}':\n\n"
-            )
 
             if content_len > self.max_chunk_size:
                 # Large section: flush buffer and split
@@ -96,6 +98,7 @@ class AdvancedAcademicChunker:
                     final_docs.extend(self._create_merged_documents(small_sections, base_metadata))
                     small_sections = []
 
+                header = self._section_header(base_metadata, section_title)
                 sub_chunks = self.text_splitter.split_text(content)
                 for i, sub in enumerate(sub_chunks):
                     meta = {
@@ -115,6 +118,7 @@ class AdvancedAcademicChunker:
                     final_docs.extend(self._create_merged_documents(small_sections, base_metadata))
                     small_sections = []
 
+                header = self._section_header(base_metadata, section_title)
                 meta = {**base_metadata, "section_title": section_title, "part_of_section": "1/1"}
                 final_docs.append(Document(page_content=header + content, metadata=meta))
 
@@ -124,6 +128,30 @@ class AdvancedAcademicChunker:
 
         return final_docs
 
+    def chunk_courses(self, courses: Iterable[Dict[str, Any]]) -> List[Document]:
+        """
+        Chunk many courses in order.
+
+        Args:
+            courses: Course JSON objects, as a list or a stream
+
+        Returns:
+            Documents for all courses, in course order
+        """
+        documents: List[Document] = []
+        for course in courses:
+            documents.extend(self.chunk_course_from_json(course))
+        return documents
+
+    @staticmethod
+    def _section_header(metadata: Dict[str, Any], section_title: str) -> str:
+        """Build the context header prefixed to a single-section document."""
+        return (
+            f"Regarding the course '{metadata['course_title']}' "
+            f"({metadata['course_code']}). "
+            f"This section describes '{section_title}':\n\n"
+        )
+
     def _create_summary_document(self, metadata: Dict[str, Any]) -> Document:
         """Create a summary document for the course."""
         summary_lines = [
@@ -149,27 +177,31 @@ class AdvancedAcademicChunker:
     ) -> List[Document]:
         """Merge small sections into larger documents."""
         docs = []
-        content_acc = ""
+        content_parts: List[str] = []
+        content_len = 0
         titles_acc = []
 
         for sec in sections:
             body = f"--- Section: {sec['title']} ---\n{sec['content'].strip()}"
+            body_len = len(body)
 
-            if len(content_acc) + len(body) > self.max_chunk_size and content_acc:
-                docs.append(self._finalize_merged(content_acc, titles_acc, base_metadata))
-                content_acc, titles_acc = "", []
+            if content_len + body_len > self.max_chunk_size and content_parts:
+                docs.append(self._finalize_merged(content_parts, titles_acc, base_metadata))
+                content_parts, content_len, titles_acc = [], 0, []
 
-            content_acc += body + "\n\n"
+            content_parts.append(body)
+            content_parts.append("\n\n")
+            content_len += body_len + 2
             titles_acc.append(sec['title'])
 
-        if content_acc:
-            docs.append(self._finalize_merged(content_acc, titles_acc, base_metadata))
+        if content_parts:
+            docs.append(self._finalize_merged(content_parts, titles_acc, base_metadata))
 
         return docs
 
     def _finalize_merged(
         self,
-        content: str,
+        content_parts: List[str],
         titles: List[str],
         base_metadata: Dict
     ) -> Document:
@@ -187,4 +219,5 @@ class AdvancedAcademicChunker:
             "part_of_section": "1/1"
         }
 
-        return Document(page_content=header + content.strip(), metadata=meta)
+        content = "".join(content_parts).strip()
+        return Document(page_content=f"{header}{content}", metadata=meta)
@@ -0,0 +1,54 @@
+"""
+Course Loader
+
+Reads extracted course records from the JSON or JSON Lines file produced
+by the PDF pipeline.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterator
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def iter_courses(json_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield course records from a JSON list or a JSON Lines (.jsonl) file.
+
+    JSON Lines files are read one line at a time. For a JSON list with
+    ijson installed the array is parsed incrementally, so only one course
+    is held in memory at a time; otherwise the file is loaded whole.
+
+    Args:
+        json_file: Path to the extracted courses JSON or JSON Lines file
+
+    Yields:
+        Course dictionaries, in file order
+    """
+    loads = orjson.loads if orjson is not None else json.loads
+
+    if json_file.endswith('.jsonl'):
+        with open(json_file, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield loads(line)
+        return
+
+    if ijson is None:
+        with open(json_file, 'rb') as f:
+            yield from loads(f.read())
+        return
+
+    with open(json_file, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
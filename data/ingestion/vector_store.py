@@ -4,8 +4,13 @@ LangChain Vector Store Manager
 Manages ChromaDB vector store with HuggingFace embeddings.
 """
 
+import contextlib
+import hashlib
 import logging
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional, Tuple
 
 import numpy as np
@@ -28,24 +33,87 @@ class CrossEncoderReRanker:
     Cross-Encoder based reranker for document relevance scoring.
     """
 
-    def __init__(self, model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2'):
+    def __init__(
+        self,
+        model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2',
+        backend: str = "torch",
+        model_kwargs: Optional[Dict[str, Any]] = None,
+        batch_size: int = 64,
+        max_text_chars: int = 2000,
+        max_cached_scores: int = 10_000
+    ):
         """
         Initialize the reranker.
 
         Args:
             model_name: HuggingFace model name for cross-encoder
+            backend: Inference backend ("torch", "onnx" or "openvino")
+            model_kwargs: Optional backend model arguments, e.g.
+                {"file_name": "onnx/model_qint8_avx512_vnni.onnx"}
+            batch_size: Upper bound on pairs scored per forward pass
+            max_text_chars: Document text cap; 512 WordPieces never cover
+                more, so the tokenizer skips text it would truncate anyway
+            max_cached_scores: Maximum memoized (query, document) scores;
+                documents are keyed by a digest of the scored text, so the
+                cache never holds full chunk text
         """
-        self.model = CrossEncoder(model_name, max_length=512)
-        logger.info(f"Cross-encoder model '{model_name}' loaded.")
+        self.batch_size = batch_size
+        self.max_text_chars = max_text_chars
+        self.max_cached_scores = max_cached_scores
+        self._score_cache: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.use_fp16 = backend == "torch" and torch is not None and torch.cuda.is_available()
+
+        # Weights are loaded on the first rerank call
+        self.model_name = model_name
+        self.backend = backend
+        self.model_kwargs = model_kwargs
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self) -> CrossEncoder:
+        """Cross-encoder model, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self) -> CrossEncoder:
+        """Load the cross-encoder, falling back to torch if the backend fails."""
+        model = None
+        if self.backend != "torch":
+            try:
+                model = CrossEncoder(
+                    self.model_name,
+                    max_length=512,
+                    backend=self.backend,
+                    model_kwargs=self.model_kwargs
+                )
+            except Exception as e:
+                logger.warning(f"Cross-encoder {self.backend} backend unavailable, using torch: {e}")
+
+        if model is None:
+            model = CrossEncoder(self.model_name, max_length=512)
+
+        logger.info(f"Cross-encoder model '{self.model_name}' loaded.")
+        return model
 
     def _sigmoid(self, x):
         """Apply sigmoid to convert logits to probabilities."""
         return 1 / (1 + np.exp(-x))
 
+    def _score_key(self, query: str, doc: Document) -> Tuple[str, bytes]:
+        """Cache key for a (query, document) score: the query plus a digest of the scored text."""
+        text = doc.page_content[:self.max_text_chars]
+        return query, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
     def rerank(
         self,
         query: str,
-        documents: List[Document]
+        documents: List[Document],
+        top_k: Optional[int] = None
     ) -> List[Tuple[Document, float]]:
         """
         Rerank documents based on relevance to query.
@@ -53,6 +121,7 @@ class CrossEncoderReRanker:
         Args:
             query: Search query
             documents: Documents to rerank
+            top_k: Optional number of best documents to return
 
         Returns:
             List of (document, score) tuples sorted by score
@@ -60,15 +129,58 @@ class CrossEncoderReRanker:
         if not documents:
             return []
 
-        pairs = [[query, doc.page_content] for doc in documents]
-
-        raw_scores = self.model.predict(pairs, convert_to_tensor=True, show_progress_bar=False)
-        scores = self._sigmoid(raw_scores.cpu().numpy())
-
-        results = list(zip(documents, scores))
-        results.sort(key=lambda x: x[1], reverse=True)
+        scores = np.empty(len(documents), dtype=np.float32)
+        uncached = []
+        keys = [self._score_key(query, doc) for doc in documents]
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._score_cache.get(key)
+                if cached is None:
+                    uncached.append(i)
+                else:
+                    self._score_cache.move_to_end(key)
+                    scores[i] = cached
+
+        if uncached:
+            scores[uncached] = self._predict(query, [documents[i] for i in uncached])
+            with self._cache_lock:
+                for i in uncached:
+                    self._score_cache[keys[i]] = float(scores[i])
+                while len(self._score_cache) > self.max_cached_scores:
+                    self._score_cache.popitem(last=False)
+
+        # Stable, so tied documents keep their retrieval order
+        ranking = np.argsort(-scores, kind="stable")
+        if top_k is not None:
+            ranking = ranking[:top_k]
+
+        return [(documents[i], scores[i]) for i in ranking]
+
+    def _predict(self, query: str, documents: List[Document]) -> np.ndarray:
+        """Score documents against the query, returning probabilities in input order."""
+        texts = [doc.page_content[:self.max_text_chars] for doc in documents]
+
+        # Longest documents first so each sub-batch pads to similar lengths
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        pairs = [(query, texts[i]) for i in order]
+
+        autocast = (
+            torch.autocast(device_type="cuda", dtype=torch.float16)
+            if self.use_fp16 else contextlib.nullcontext()
+        )
+        with autocast:
+            raw_scores = self.model.predict(
+                pairs,
+                batch_size=min(self.batch_size, len(pairs)),
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
 
-        return results
+        # Restore the original document order
+        sorted_scores = self._sigmoid(np.asarray(raw_scores, dtype=np.float32))
+        scores = np.empty_like(sorted_scores)
+        scores[order] = sorted_scores
+        return scores
 
 
 class LangChainVectorStoreManager:
@@ -81,7 +193,12 @@ class LangChainVectorStoreManager:
         persist_directory: str,
         model_name: str,
         collection_name: str,
-        device: str = "auto"
+        device: str = "auto",
+        reranker_backend: str = "torch",
+        reranker_model_kwargs: Optional[Dict[str, Any]] = None,
+        rerank_min_candidates: int = 2,
+        embed_batch_size: int = 64,
+        embed_dtype: Optional[str] = None
     ):
         """
         Initialize the vector store manager.
@@ -91,9 +208,19 @@ class LangChainVectorStoreManager:
             model_name: HuggingFace embedding model name
             collection_name: ChromaDB collection name
             device: Device for embeddings (auto/cpu/cuda)
+            reranker_backend: Cross-encoder backend for retrieve_with_rerank
+            reranker_model_kwargs: Optional cross-encoder backend arguments
+            rerank_min_candidates: Fewest candidates worth running the
+                cross-encoder on; smaller sets keep retrieval order
+            embed_batch_size: Texts per embedding forward pass
+            embed_dtype: Optional embedding weight dtype, e.g. "float16" or
+                "bfloat16"; applied on CUDA only, other devices fall back
+                to float32. Queries must use the dtype the collection was
+                ingested with
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.rerank_min_candidates = rerank_min_candidates
 
         # Determine device
         if device != "auto":
@@ -103,16 +230,30 @@ class LangChainVectorStoreManager:
                 'device': 'cuda' if (torch and torch.cuda.is_available()) else 'cpu'
             }
 
+        if embed_dtype and embed_dtype != "float32":
+            if torch is not None and str(model_kwargs["device"]).startswith("cuda"):
+                # Half-precision weights halve the memory traffic per forward pass
+                model_kwargs["model_kwargs"] = {"torch_dtype": getattr(torch, embed_dtype)}
+            else:
+                # CPU kernels for half precision are slow or missing
+                logger.warning(
+                    f"embed_dtype '{embed_dtype}' needs a CUDA device, "
+                    f"using float32 on '{model_kwargs['device']}'"
+                )
+
         logger.info(f"Using device: {device} for embeddings (Bi-Encoder)")
 
         self.embedding_model = HuggingFaceEmbeddings(
             model_name=model_name,
             model_kwargs=model_kwargs,
-            encode_kwargs={"normalize_embeddings": True}
+            encode_kwargs={"normalize_embeddings": True, "batch_size": embed_batch_size}
         )
 
         self.db: Optional[Chroma] = None
-        self.reranker = CrossEncoderReRanker()
+        self.reranker = CrossEncoderReRanker(
+            backend=reranker_backend,
+            model_kwargs=reranker_model_kwargs
+        )
 
     def _get_db_instance(self) -> Chroma:
         """Get or create ChromaDB instance."""
@@ -128,13 +269,38 @@ class LangChainVectorStoreManager:
             )
         return self.db
 
-    def ingest_documents(self, documents: List[Document], batch_size: int = 2):
+    def vectorstore(self) -> Chroma:
+        """
+        Get the underlying Chroma vector store.
+
+        Returns:
+            Chroma instance, connected on first use
+        """
+        return self._get_db_instance()
+
+    def ingest_documents(
+        self,
+        documents: List[Document],
+        batch_size: int = 64,
+        max_concurrency: int = 1
+    ):
         """
         Ingest documents into the vector store.
 
+        Each batch is embedded in a single encoder call, so batches should be
+        at least as large as the embedding batch size. With max_concurrency
+        above 1, batches are submitted from a small thread pool so one
+        batch's Chroma write overlaps the next batch's embedding.
+
+        Concurrent writes to a local persistent Chroma collection are not
+        guaranteed to be safe (SQLite locking and HNSW index updates), so
+        ingestion is serial by default. Only raise max_concurrency against
+        a store known to handle parallel writers, such as a Chroma server.
+
         Args:
             documents: Documents to ingest
             batch_size: Batch size for ingestion
+            max_concurrency: Batches in flight at once (1 ingests serially)
         """
         if not documents:
             logger.warning("No documents to ingest.")
@@ -146,13 +312,19 @@ class LangChainVectorStoreManager:
         )
 
         db = self._get_db_instance()
+        batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+        total_batches = len(batches)
 
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            db.add_documents(batch)
-            batch_num = i // batch_size + 1
-            total_batches = (len(documents) + batch_size - 1) // batch_size
-            logger.info(f"Ingested batch {batch_num}/{total_batches}")
+        if max_concurrency <= 1:
+            for batch_num, batch in enumerate(batches, 1):
+                db.add_documents(batch)
+                logger.info(f"Ingested batch {batch_num}/{total_batches}")
+        else:
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                futures = [executor.submit(db.add_documents, batch) for batch in batches]
+                for done, future in enumerate(as_completed(futures), 1):
+                    future.result()
+                    logger.info(f"Ingested batch {done}/{total_batches}")
 
         logger.info("Ingestion complete.")
 
@@ -173,13 +345,7 @@ class LangChainVectorStoreManager:
         Returns:
             LangChain retriever
         """
-        if self.db is None:
-            logger.info(f"Loading existing DB from {self.persist_directory}")
-            self.db = Chroma(
-                persist_directory=self.persist_directory,
-                embedding_function=self.embedding_model,
-                collection_name=self.collection_name
-            )
+        db = self._get_db_instance()
 
         if search_kwargs is None:
             search_kwargs = {'k': 10}
@@ -187,7 +353,7 @@ class LangChainVectorStoreManager:
         if search_type == "similarity_score_threshold":
             search_kwargs['score_threshold'] = score_threshold
 
-        return self.db.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+        return db.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
 
     def retrieve_with_rerank(
         self,
@@ -220,8 +386,12 @@ class LangChainVectorStoreManager:
             logger.warning("No candidates found.")
             return []
 
-        logger.info(f"Reranking {len(candidates)} candidates...")
-        reranked = self.reranker.rerank(query, candidates)
+        if len(candidates) < self.rerank_min_candidates:
+            # Nothing to reorder: skip the cross-encoder forward pass
+            reranked = [(doc, 1.0) for doc in candidates]
+        else:
+            logger.info(f"Reranking {len(candidates)} candidates...")
+            reranked = self.reranker.rerank(query, candidates)
 
         # Accumulate to target score
         final_results = []
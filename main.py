@@ -6,7 +6,6 @@ Refactored modular version of the Academic RAG system.
 """
 
 import argparse
-import json
 import logging
 import os
 import sys
@@ -19,6 +18,83 @@ from utils.logging_config import setup_logging, get_logger
 from utils.port_utils import find_available_port
 
 
+def build_agent(
+    json_file: str = settings.json_file,
+    persist_dir: str = settings.persist_dir,
+    ollama_url: str = settings.ollama_base_url,
+    ollama_model: str = settings.ollama_model,
+    device: str = settings.device
+):
+    """
+    Load course data and build the RAG agent.
+
+    Args:
+        json_file: Path to course data JSON
+        persist_dir: ChromaDB persist directory
+        ollama_url: Ollama base URL
+        ollama_model: Ollama model name
+        device: Device: auto | cpu | cuda:N
+
+    Returns:
+        Initialized ContextAwareRetrievalAgent
+
+    Raises:
+        FileNotFoundError: If the data file does not exist
+    """
+    logger = get_logger(__name__)
+
+    # Validate data file
+    if not os.path.exists(json_file):
+        raise FileNotFoundError(f"Data file not found: {json_file}")
+
+    # Import here to avoid circular imports
+    from data.ingestion.chunker import AdvancedAcademicChunker
+    from data.ingestion.course_loader import iter_courses
+    from data.ingestion.vector_store import LangChainVectorStoreManager
+    from services.agent import ContextAwareRetrievalAgent
+
+    # Process documents
+    logger.info(f"Loading and processing documents from {json_file}")
+    chunker = AdvancedAcademicChunker()
+    all_documents = chunker.chunk_courses(iter_courses(json_file))
+    logger.info(f"Processed {len(all_documents)} document chunks")
+
+    # Setup device
+    if device.startswith('cuda:'):
+        device_id = device.split(':')[1]
+        os.environ['CUDA_VISIBLE_DEVICES'] = device_id
+        logger.info(f"Set CUDA_VISIBLE_DEVICES={device_id}")
+
+    # Initialize vector store
+    logger.info(f"Initializing ChromaDB at {persist_dir}")
+    db_manager = LangChainVectorStoreManager(
+        model_name=settings.embed_model,
+        collection_name=settings.collection_name,
+        persist_directory=persist_dir,
+        reranker_backend=settings.rerank_backend,
+        reranker_model_kwargs=(
+            {"file_name": settings.rerank_model_file} if settings.rerank_model_file else None
+        ),
+        embed_dtype=settings.embed_dtype
+    )
+
+    # Initialize agent
+    logger.info("Initializing RAG Agent...")
+
+    vectorstore = db_manager.vectorstore()
+
+    agent = ContextAwareRetrievalAgent(
+        vectorstore=vectorstore,
+        all_documents=all_documents,
+        settings=settings,
+        ollama_base_url=ollama_url,
+        model_name=ollama_model
+    )
+    logger.info("✅ Agent initialized successfully")
+
+    return agent
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Academic RAG System (Refactored)")
@@ -54,59 +130,20 @@ def main():
     print("🚀 Starting Academic RAG System (Refactored)")
     print("=" * 60)
 
-    # Validate data file
-    if not os.path.exists(args.json_file):
-        logger.error(f"Data file not found: {args.json_file}")
+    try:
+        agent = build_agent(
+            json_file=args.json_file,
+            persist_dir=args.persist_dir,
+            ollama_url=args.ollama_url,
+            ollama_model=args.ollama_model,
+            device=args.device
+        )
+    except FileNotFoundError as e:
+        logger.error(str(e))
         return 1
 
-    # Load data
-    logger.info(f"Loading data from {args.json_file}")
-    with open(args.json_file, 'r', encoding='utf-8') as f:
-        courses = json.load(f)
-
-    # Import here to avoid circular imports
-    from data.ingestion.chunker import AdvancedAcademicChunker
-    from data.ingestion.vector_store import LangChainVectorStoreManager
-    from services.agent import ContextAwareRetrievalAgent
     from api.app import create_app
 
-    # Process documents
-    logger.info("Processing documents...")
-    chunker = AdvancedAcademicChunker()
-    all_documents = []
-    for course in courses:
-        all_documents.extend(chunker.chunk_course_from_json(course))
-    logger.info(f"Processed {len(all_documents)} document chunks")
-
-    # Setup device
-    if args.device.startswith('cuda:'):
-        device_id = args.device.split(':')[1]
-        os.environ['CUDA_VISIBLE_DEVICES'] = device_id
-        logger.info(f"Set CUDA_VISIBLE_DEVICES={device_id}")
-
-    # Initialize vector store
-    logger.info(f"Initializing ChromaDB at {args.persist_dir}")
-    db_manager = LangChainVectorStoreManager(
-        model_name=settings.embed_model,
-        collection_name=settings.collection_name,
-        persist_directory=args.persist_dir
-    )
-
-    # Initialize agent
-    logger.info("Initializing RAG Agent...")
-
-    # Get retriever and extract vectorstore
-    retriever = db_manager.get_retriever(search_type="mmr", search_kwargs={'k': 10})
-    vectorstore = retriever.vectorstore
-
-    agent = ContextAwareRetrievalAgent(
-        vectorstore=vectorstore,
-        all_documents=all_documents,
-        ollama_base_url=args.ollama_url,
-        model_name=args.ollama_model
-    )
-    logger.info("✅ Agent initialized successfully")
-
     # Smoke tests
     if args.smoke_test:
         print("\n🧪 Running smoke tests...")
@@ -145,7 +182,7 @@ def main():
     print("=" * 60)
 
     try:
-        app.run(host=args.host, port=port, debug=args.debug)
+        app.run(host=args.host, port=port, debug=args.debug, threaded=True)
     except KeyboardInterrupt:
         print("\n👋 Shutting down...")
 
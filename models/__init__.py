@@ -3,10 +3,12 @@
 from .state import RetrievalState, RAGResponse
 from .confidence import ConfidenceMetrics
 from .catalog import MetadataCatalog
+from .doc_view import DocView
 
 __all__ = [
     "RetrievalState",
     "RAGResponse",
     "ConfidenceMetrics",
     "MetadataCatalog",
+    "DocView",
 ]
@@ -6,12 +6,20 @@ and fuzzy matching of course information.
 """
 
 import difflib
-from typing import List, Dict, Set, Optional, Tuple, DefaultDict
+import threading
+from typing import List, Dict, Set, FrozenSet, Optional, Tuple, DefaultDict
 from collections import defaultdict
+
+import numpy as np
 from langchain_core.documents import Document
 
 from config.constants import DEFAULT_FUZZY_MATCH_CUTOFF
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
 
 class MetadataCatalog:
     """
@@ -53,6 +61,35 @@ class MetadataCatalog:
             if title:
                 self.titles_set.add(title)
 
+        # Immutable membership set for exists_code, safe to share across threads
+        self._codes_frozen: FrozenSet[str] = frozenset(self.codes_to_titles)
+
+        # Parallel code/title arrays for single-pass scans
+        self._codes_array: List[str] = list(self.codes_to_titles.keys())
+        self._titles_array: List[str] = list(self.codes_to_titles.values())
+        self._titles_lower: List[str] = [title.lower() for title in self._titles_array]
+        self._title_index: Tuple[Tuple[str, str], ...] = tuple(zip(self._titles_lower, self._codes_array))
+
+        # Reverse lowercase title -> code index; the first code for a title wins
+        self._lower_title_to_code: Dict[str, str] = {}
+        for title_lower, code in self._title_index:
+            self._lower_title_to_code.setdefault(title_lower, code)
+
+        # difflib fallback: one matcher per title with the title preloaded as
+        # seq2, so its lookup tables are built once instead of per query
+        self._title_matchers: List[Tuple[str, difflib.SequenceMatcher]] = [
+            (title, difflib.SequenceMatcher(None, "", title.lower()))
+            for title in self.titles_set
+        ]
+        self._matcher_lock = threading.Lock()
+
+        # The catalog is never modified after construction, so count once
+        self._stats: Dict[str, int] = {
+            "total_course_codes": len(self.codes_to_titles),
+            "total_unique_titles": len(self.titles_set),
+            "total_files": sum(len(files) for files in self.codes_to_files.values())
+        }
+
     def exists_code(self, code: str) -> bool:
         """
         Check if a course code exists in the catalog.
@@ -63,7 +100,7 @@ class MetadataCatalog:
         Returns:
             True if the course code exists, False otherwise
         """
-        return code in self.codes_to_titles
+        return code in self._codes_frozen
 
     def get_title(self, code: str) -> Optional[str]:
         """
@@ -85,9 +122,9 @@ class MetadataCatalog:
         """
         Fuzzy match a course title to a course code.
 
-        Uses sequence matching to find the best matching title in the catalog,
-        then returns the corresponding course code if the match quality exceeds
-        the cutoff threshold.
+        Uses RapidFuzz when installed (difflib otherwise) to find the best
+        matching title in the catalog, then returns the corresponding course
+        code if the match quality exceeds the cutoff threshold.
 
         Args:
             query_title: The title to match
@@ -100,28 +137,95 @@ class MetadataCatalog:
         if not self.titles_set or not query_title:
             return None
 
+        if process is not None:
+            hit = process.extractOne(
+                query_title.lower(),
+                self._titles_lower,
+                scorer=fuzz.ratio,
+                score_cutoff=cutoff * 100
+            )
+            if hit is None:
+                return None
+            _, score, index = hit
+            return self._codes_array[index], score / 100
+
         best_match = None
         best_score = 0.0
-
-        # Find best matching title using sequence matcher
-        for title in self.titles_set:
-            score = difflib.SequenceMatcher(
-                None,
-                query_title.lower(),
-                title.lower()
-            ).ratio()
-            if score > best_score:
-                best_match, best_score = title, score
+        query_lower = query_title.lower()
+
+        # Find best matching title using sequence matcher. The cheap upper
+        # bounds skip titles that cannot beat the current best or the cutoff.
+        with self._matcher_lock:
+            for title, matcher in self._title_matchers:
+                matcher.set_seq1(query_lower)
+                floor = max(best_score, cutoff)
+                if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+                    continue
+                score = matcher.ratio()
+                if score > best_score:
+                    best_match, best_score = title, score
 
         # Return code if match quality exceeds cutoff
         if best_match and best_score >= cutoff:
-            # Find the code for this title
-            for code, title in self.codes_to_titles.items():
-                if title.lower() == best_match.lower():
-                    return code, best_score
+            code = self._lower_title_to_code.get(best_match.lower())
+            if code:
+                return code, best_score
 
         return None
 
+    def fuzzy_titles_to_codes(
+        self,
+        query_titles: List[str],
+        cutoff: float = DEFAULT_FUZZY_MATCH_CUTOFF
+    ) -> List[Optional[Tuple[str, float]]]:
+        """
+        Fuzzy match several titles to course codes in one pass.
+
+        Equivalent to calling fuzzy_title_to_code for each title, but with
+        RapidFuzz the whole query x catalog score matrix is computed at once.
+
+        Args:
+            query_titles: Titles to match
+            cutoff: Minimum similarity score (0-1) to consider a match
+
+        Returns:
+            One (course_code, similarity_score) tuple or None per query title
+        """
+        if process is None or not self._titles_lower or not query_titles:
+            return [self.fuzzy_title_to_code(title, cutoff) for title in query_titles]
+
+        scores = process.cdist(
+            [title.lower() for title in query_titles],
+            self._titles_lower,
+            scorer=fuzz.ratio,
+            score_cutoff=cutoff * 100,
+            dtype=np.float64
+        )
+        best = scores.argmax(axis=1)
+
+        results: List[Optional[Tuple[str, float]]] = []
+        for row, (title, index) in enumerate(zip(query_titles, best)):
+            score = float(scores[row, index])
+            if not title or score < cutoff * 100:
+                results.append(None)
+            else:
+                results.append((self._codes_array[index], score / 100))
+
+        return results
+
+    def codes_with_title_in(self, text: str) -> List[str]:
+        """
+        Find course codes whose title appears verbatim in the text.
+
+        Args:
+            text: Text to scan (matched case-insensitively)
+
+        Returns:
+            List of course codes in catalog order
+        """
+        text_lower = text.lower()
+        return [code for title, code in self._title_index if title in text_lower]
+
     def get_all_codes(self) -> List[str]:
         """
         Get all course codes in the catalog.
@@ -147,8 +251,4 @@ class MetadataCatalog:
         Returns:
             Dictionary with counts of courses, titles, and files
         """
-        return {
-            "total_course_codes": len(self.codes_to_titles),
-            "total_unique_titles": len(self.titles_set),
-            "total_files": sum(len(files) for files in self.codes_to_files.values())
-        }
+        return dict(self._stats)
@@ -0,0 +1,57 @@
+"""
+Document View
+
+Normalized per-document fields shared by the stages of one query.
+"""
+
+from typing import Optional
+
+from langchain_core.documents import Document
+
+
+class DocView:
+    """
+    Metadata and content of a Document in the forms the pipeline compares.
+
+    Context expansion and confidence scoring walk the same reranked documents;
+    the agent builds one view per document for each query and hands the views
+    to both, so they share the normalized fields instead of re-deriving them
+    per stage. The lowercased content is built on first use since only entity
+    matching needs it.
+    """
+
+    __slots__ = (
+        "course_code",
+        "course_title",
+        "section_title",
+        "code_lower",
+        "title_lower",
+        "section_lower",
+        "_page_content",
+        "_content_lower",
+    )
+
+    def __init__(self, doc: Document) -> None:
+        """
+        Build the view for a document.
+
+        Args:
+            doc: LangChain Document
+        """
+        metadata = doc.metadata or {}
+        self.course_code: str = metadata.get("course_code") or ""
+        self.course_title: str = metadata.get("course_title") or ""
+        self.section_title: str = metadata.get("section_title") or ""
+        self.code_lower = self.course_code.lower()
+        self.title_lower = self.course_title.lower()
+        self.section_lower = self.section_title.lower()
+        self._page_content = doc.page_content or ""
+        self._content_lower: Optional[str] = None
+
+    @property
+    def content_lower(self) -> str:
+        """Lowercased page content, computed on first access."""
+        if self._content_lower is None:
+            self._content_lower = self._page_content.lower()
+        return self._content_lower
+
@@ -30,7 +30,10 @@ class RetrievalState(TypedDict):
     rerank_scores: List[float]
 
 
-@dataclass
+_JSON_SAFE_TYPES = (str, int, float, bool, list, dict, type(None))
+
+
+@dataclass(slots=True)
 class RAGResponse:
     """
     Complete response from the RAG system.
@@ -65,11 +68,18 @@ class RAGResponse:
         Returns:
             JSON-serializable dictionary
         """
-        data = self.to_dict()
-        # Ensure all values are JSON serializable
-        if isinstance(data.get('metadata'), dict):
-            # Convert any non-serializable metadata values to strings
-            for key, value in data['metadata'].items():
-                if not isinstance(value, (str, int, float, bool, list, dict, type(None))):
-                    data['metadata'][key] = str(value)
-        return data
+        # Single shallow pass: no asdict deep copy, metadata copied once
+        return {
+            "query": self.query,
+            "answer": self.answer,
+            "confidence": self.confidence,
+            "sources": list(self.sources),
+            "generation_mode": self.generation_mode,
+            "processing_time": self.processing_time,
+            "reasoning_steps": list(self.reasoning_steps),
+            "conflicts_detected": list(self.conflicts_detected),
+            "metadata": {
+                key: value if isinstance(value, _JSON_SAFE_TYPES) else str(value)
+                for key, value in self.metadata.items()
+            },
+        }
@@ -12,6 +12,8 @@ Usage:
     python scripts/extract_pdfs.py                     # Use defaults
     python scripts/extract_pdfs.py --input-dir path    # Custom input
     python scripts/extract_pdfs.py --output path       # Custom output
+    python scripts/extract_pdfs.py --workers 4         # Parallel parsing
+    python scripts/extract_pdfs.py --output out.jsonl  # Stream JSON Lines
 """
 
 import argparse
@@ -19,6 +21,11 @@ import json
 import os
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -34,6 +41,13 @@ DEFAULT_INPUT_DIR = "/project_antwerp/pdf_pipline/data/upload"
 DEFAULT_OUTPUT_FILE = "/project_antwerp/pdf_pipline/data/processed/all_extracted.json"
 
 
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, with orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Extract course data from PDF files"
@@ -51,6 +65,13 @@ def main():
         help=f"Output JSON file (default: {DEFAULT_OUTPUT_FILE})"
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for PDF parsing (default: CPU count)"
+    )
+
     args = parser.parse_args()
 
     print("=" * 60)
@@ -78,19 +99,27 @@ def main():
     print(f"\n🔄 Processing PDFs...")
 
     extractor = PDFDataExtractor()
-    results = extractor.process_directory(args.input_dir)
-
-    # Save results
     print(f"\n💾 Saving to: {args.output}")
-    with open(args.output, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.output.endswith(".jsonl"):
+        # JSON Lines: write each course as soon as its PDF is parsed
+        count = 0
+        with open(args.output, 'wb') as f:
+            for result in extractor.iter_directory(args.input_dir, max_workers=args.workers):
+                f.write(_dumps(result) + b"\n")
+                count += 1
+    else:
+        results = extractor.process_directory(args.input_dir, max_workers=args.workers)
+        count = len(results)
+        with open(args.output, 'wb') as f:
+            f.write(_dumps(results, indent=True))
 
     # Done
     print("\n" + "=" * 60)
     print("✅ Extraction Complete!")
     print("=" * 60)
     print(f"\n📊 Summary:")
-    print(f"   - PDFs processed: {len(results)}")
+    print(f"   - PDFs processed: {count}")
     print(f"   - Output file: {args.output}")
     print(f"\n🚀 Next step - ingest into database:")
     print(f"   python scripts/ingest_data.py --json-file {args.output}")
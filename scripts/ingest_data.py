@@ -12,26 +12,164 @@ Usage:
     python scripts/ingest_data.py                    # Ingest to existing DB
     python scripts/ingest_data.py --clean            # Clear and reingest
     python scripts/ingest_data.py --json-file path   # Use custom data file
+    python scripts/ingest_data.py --auto-tune-batch  # Pick the fastest batch size
+    python scripts/ingest_data.py --stream           # Embed while still chunking
 """
 
 import argparse
-import json
 import os
 import sys
 import shutil
 import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from langchain_core.documents import Document
+
 from config import settings
-from data.ingestion import AdvancedAcademicChunker, LangChainVectorStoreManager
+from data.ingestion import AdvancedAcademicChunker, LangChainVectorStoreManager, iter_courses
 from utils.logging_config import setup_logging, get_logger
 
 # Setup logging
 setup_logging()
 logger = get_logger(__name__)
 
+# Batch sizes tried by --auto-tune-batch
+TUNE_BATCH_SIZES = (32, 64, 128, 256, 512)
+
+# Chunked batches buffered ahead of the embedding stage by --stream
+STREAM_QUEUE_SIZE = 4
+
+
+def auto_tune_batch_size(
+    manager: LangChainVectorStoreManager,
+    documents: List[Document],
+    candidates: Tuple[int, ...] = TUNE_BATCH_SIZES
+) -> Tuple[int, int]:
+    """
+    Pick the fastest ingestion batch size by timing real ingestion.
+
+    One untimed warm-up batch goes first so model loading and kernel
+    warm-up do not count against the first candidate. Each candidate then
+    ingests its own consecutive slice of the documents (two batches'
+    worth), so nothing is written twice.
+
+    Args:
+        manager: Vector store manager to ingest into
+        documents: Documents to ingest
+        candidates: Batch sizes to try
+
+    Returns:
+        Tuple of (best batch size, number of documents already ingested)
+    """
+    best_size, best_rate = candidates[0], 0.0
+
+    warmup = documents[:candidates[0]]
+    manager.ingest_documents(warmup, batch_size=candidates[0])
+    offset = len(warmup)
+
+    for size in candidates:
+        sample = documents[offset:offset + 2 * size]
+        if len(sample) < 2 * size:
+            break
+
+        start = time.perf_counter()
+        manager.ingest_documents(sample, batch_size=size)
+        rate = len(sample) / (time.perf_counter() - start)
+        offset += len(sample)
+
+        logger.info(f"Batch size {size}: {rate:.1f} docs/s")
+        if rate > best_rate:
+            best_size, best_rate = size, rate
+
+    logger.info(f"Selected batch size {best_size}")
+    return best_size, offset
+
+
+def stream_ingest(
+    manager: LangChainVectorStoreManager,
+    chunker: AdvancedAcademicChunker,
+    courses: Iterable[Dict[str, Any]],
+    batch_size: int,
+    max_concurrency: int = 1
+) -> Tuple[int, int]:
+    """
+    Chunk and ingest courses as a pipeline instead of two serial phases.
+
+    A producer thread chunks courses into batches of batch_size documents
+    and puts them on a bounded queue; max_concurrency consumer threads
+    embed and write each batch as soon as it is ready. The bounded queue
+    holds chunking back when embedding falls behind. Even with a single
+    consumer, chunking overlaps embedding; more consumers mean parallel
+    writes, which a local persistent Chroma collection may not tolerate.
+
+    Args:
+        manager: Vector store manager to ingest into
+        chunker: Chunker producing documents from course JSON
+        courses: Course JSON objects, as a list or a stream
+        batch_size: Documents per ingestion batch
+        max_concurrency: Consumer threads writing batches at once
+
+    Returns:
+        Tuple of (documents ingested, courses chunked)
+    """
+    batches: "queue.Queue[Any]" = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    done = object()
+    consumers = max(1, max_concurrency)
+    counts = {"documents": 0, "courses": 0}
+    errors: List[BaseException] = []
+    count_lock = threading.Lock()
+
+    def produce() -> None:
+        buffer: List[Document] = []
+        try:
+            for course in courses:
+                buffer.extend(chunker.chunk_course_from_json(course))
+                counts["courses"] += 1
+                while len(buffer) >= batch_size:
+                    batches.put(buffer[:batch_size])
+                    buffer = buffer[batch_size:]
+            if buffer:
+                batches.put(buffer)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            for _ in range(consumers):
+                batches.put(done)
+
+    def consume() -> None:
+        db = manager.vectorstore()
+        while True:
+            batch = batches.get()
+            if batch is done:
+                return
+            if errors:
+                continue  # Drain so the producer is never blocked
+            try:
+                db.add_documents(batch)
+            except BaseException as e:
+                errors.append(e)
+                continue
+            with count_lock:
+                counts["documents"] += len(batch)
+                logger.info(f"Ingested {counts['documents']} documents")
+
+    threads = [threading.Thread(target=produce, name="chunker")]
+    threads += [threading.Thread(target=consume, name=f"ingest-{i}") for i in range(consumers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return counts["documents"], counts["courses"]
+
 
 def main():
     parser = argparse.ArgumentParser(
@@ -71,12 +209,51 @@ def main():
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=2,
-        help="Batch size for ingestion (default: 2)"
+        default=256,
+        help="Batch size for ingestion (default: 256)"
+    )
+
+    parser.add_argument(
+        "--auto-tune-batch",
+        action="store_true",
+        help="Time a few batch sizes on the first documents and use the fastest"
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Ingestion batches in flight at once (default: 1). Values above 1 "
+             "write to Chroma in parallel, which a local persistent store may "
+             "not handle safely"
+    )
+
+    parser.add_argument(
+        "--embed-batch-size",
+        type=int,
+        default=64,
+        help="Texts per embedding forward pass (default: 64)"
+    )
+
+    parser.add_argument(
+        "--embed-dtype",
+        choices=["float32", "float16", "bfloat16"],
+        default=settings.embed_dtype,
+        help="Embedding weight dtype, applied on CUDA only; use the same value when serving "
+             "(default: RAG_EMBED_DTYPE or float32)"
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Embed batches while chunking continues"
     )
 
     args = parser.parse_args()
 
+    if args.stream and args.auto_tune_batch:
+        parser.error("--auto-tune-batch needs all documents up front and cannot be used with --stream")
+
     print("=" * 60)
     print("🚀 Academic RAG - Data Ingestion Script")
     print("=" * 60)
@@ -100,22 +277,23 @@ def main():
     # Create persist directory if needed
     os.makedirs(args.persist_dir, exist_ok=True)
 
-    # Step 1: Load JSON data
-    print(f"\n📂 Loading data from: {args.json_file}")
-    with open(args.json_file, 'r', encoding='utf-8') as f:
-        courses = json.load(f)
-    print(f"   Found {len(courses)} courses")
+    if args.stream:
+        return stream_main(args)
 
-    # Step 2: Chunk documents
+    # Step 1-2: Stream JSON data and chunk documents
+    print(f"\n📂 Loading data from: {args.json_file}")
     print(f"\n📄 Chunking documents...")
     chunker = AdvancedAcademicChunker()
-    all_documents = []
+    course_count = 0
 
-    for course in courses:
-        docs = chunker.chunk_course_from_json(course)
-        all_documents.extend(docs)
+    def counted_courses() -> Iterator[Dict[str, Any]]:
+        nonlocal course_count
+        for course in iter_courses(args.json_file):
+            course_count += 1
+            yield course
 
-    print(f"   Generated {len(all_documents)} document chunks")
+    all_documents = chunker.chunk_courses(counted_courses())
+    print(f"   Generated {len(all_documents)} document chunks from {course_count} courses")
 
     # Step 3: Initialize vector store
     print(f"\n🗄️  Initializing ChromaDB...")
@@ -126,21 +304,29 @@ def main():
     manager = LangChainVectorStoreManager(
         persist_directory=args.persist_dir,
         model_name=args.embed_model,
-        collection_name=args.collection
+        collection_name=args.collection,
+        embed_batch_size=args.embed_batch_size,
+        embed_dtype=args.embed_dtype
     )
 
     # Step 4: Ingest documents
     print(f"\n📥 Ingesting {len(all_documents)} documents...")
-    print(f"   Batch size: {args.batch_size}")
+    remaining = all_documents
+    batch_size = args.batch_size
 
-    manager.ingest_documents(all_documents, batch_size=args.batch_size)
+    if args.auto_tune_batch:
+        batch_size, tuned = auto_tune_batch_size(manager, all_documents)
+        remaining = all_documents[tuned:]
+
+    print(f"   Batch size: {batch_size}")
+    manager.ingest_documents(remaining, batch_size=batch_size, max_concurrency=args.concurrency)
 
     # Done
     print("\n" + "=" * 60)
     print("✅ Ingestion Complete!")
     print("=" * 60)
     print(f"\n📊 Summary:")
-    print(f"   - Courses processed: {len(courses)}")
+    print(f"   - Courses processed: {course_count}")
     print(f"   - Documents created: {len(all_documents)}")
     print(f"   - Database location: {args.persist_dir}")
     print(f"   - Collection: {args.collection}")
@@ -150,5 +336,45 @@ def main():
     return 0
 
 
+def stream_main(args: argparse.Namespace) -> int:
+    """Run chunking and ingestion as one pipelined pass (--stream)."""
+    print(f"\n🗄️  Initializing ChromaDB...")
+    print(f"   Directory: {args.persist_dir}")
+    print(f"   Collection: {args.collection}")
+    print(f"   Model: {args.embed_model}")
+
+    manager = LangChainVectorStoreManager(
+        persist_directory=args.persist_dir,
+        model_name=args.embed_model,
+        collection_name=args.collection,
+        embed_batch_size=args.embed_batch_size,
+        embed_dtype=args.embed_dtype
+    )
+
+    print(f"\n📥 Streaming from: {args.json_file}")
+    print(f"   Batch size: {args.batch_size}")
+    chunker = AdvancedAcademicChunker()
+    document_count, course_count = stream_ingest(
+        manager,
+        chunker,
+        iter_courses(args.json_file),
+        batch_size=args.batch_size,
+        max_concurrency=args.concurrency
+    )
+
+    print("\n" + "=" * 60)
+    print("✅ Ingestion Complete!")
+    print("=" * 60)
+    print(f"\n📊 Summary:")
+    print(f"   - Courses processed: {course_count}")
+    print(f"   - Documents created: {document_count}")
+    print(f"   - Database location: {args.persist_dir}")
+    print(f"   - Collection: {args.collection}")
+    print(f"\n🚀 You can now run the main application:")
+    print(f"   python main.py")
+
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
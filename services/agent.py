@@ -6,21 +6,23 @@ Orchestrates the complete retrieval and generation pipeline.
 
 import time
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 
+import httpx
 from langchain_core.documents import Document
 from langchain_ollama import ChatOllama
 
 from config.settings import AppSettings
 from models.state import RAGResponse
 from models.catalog import MetadataCatalog
+from models.doc_view import DocView
 from core.extractors import EntityExtractor
 from core.retriever import VectorRetriever
 from core.reranker import DocumentReranker
 from core.context_expander import ContextExpander
-from core.generator import AnswerGenerator
+from core.generator import AnswerGenerator, GenerationError
 from services.confidence_calculator import ConfidenceCalculator
-from utils.query_analysis import is_lecturer_query, is_comparison_query
+from utils.query_analysis import classify_query
 
 logger = logging.getLogger(__name__)
 
@@ -62,31 +64,71 @@ class ContextAwareRetrievalAgent:
         self.catalog = MetadataCatalog(all_documents)
         logger.info(f"Catalog built: {self.catalog.get_catalog_stats()}")
 
+        # All Ollama clients share one keep-alive connection pool
+        self.ollama_transport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=None,
+                max_keepalive_connections=self.settings.ollama_max_keepalive
+            )
+        )
+        ollama_client_kwargs = {"transport": self.ollama_transport}
+
         # Initialize LLMs
         self.extraction_llm = ChatOllama(
             model=model_name,
             base_url=ollama_base_url,
             temperature=0,
-            format="json"
+            format="json",
+            keep_alive=self.settings.ollama_keep_alive,
+            sync_client_kwargs=ollama_client_kwargs
         )
 
         self.generation_llm = ChatOllama(
             model=model_name,
             base_url=ollama_base_url,
-            temperature=0
+            temperature=0,
+            keep_alive=self.settings.ollama_keep_alive,
+            sync_client_kwargs=ollama_client_kwargs
         )
 
         # Initialize components
-        self.extractor = EntityExtractor(self.catalog, self.extraction_llm)
+        self.extractor = EntityExtractor(
+            self.catalog,
+            self.extraction_llm,
+            cache_size=self.settings.extraction_cache_size,
+            enable_llm_fallback=self.settings.enable_llm_extraction_fallback
+        )
         self.retriever = VectorRetriever(
             vectorstore,
             default_k=self.settings.default_k,
             lecturer_k=self.settings.lecturer_k
         )
-        self.reranker = DocumentReranker(self.settings.rerank_model)
+        rerank_model_kwargs = (
+            {"file_name": self.settings.rerank_model_file}
+            if self.settings.rerank_model_file else None
+        )
+        self.reranker = DocumentReranker(
+            self.settings.rerank_model,
+            backend=self.settings.rerank_backend,
+            model_kwargs=rerank_model_kwargs,
+            torch_dtype=self.settings.rerank_dtype,
+            batch_size=self.settings.rerank_batch_size,
+            num_threads=self.settings.rerank_num_threads
+        )
         self.expander = ContextExpander(self.retriever.filter_only_fetch)
-        self.generator = AnswerGenerator(self.generation_llm)
-        self.confidence = ConfidenceCalculator(ollama_base_url)
+        self.generator = AnswerGenerator(
+            self.generation_llm,
+            parallel_comparison=self.settings.parallel_comparison,
+            max_comparison_workers=self.settings.max_comparison_workers
+        )
+        # Coherence scoring needs the same deterministic JSON-mode model
+        # as extraction, so it reuses that client
+        self.confidence = ConfidenceCalculator(
+            ollama_base_url,
+            llm=self.extraction_llm,
+            enable_semantic=self.settings.enable_semantic_confidence,
+            semantic_timeout=self.settings.confidence_timeout_s
+        )
 
         # Stats
         self.stats = {
@@ -112,101 +154,190 @@ class ContextAwareRetrievalAgent:
         self.stats["total_queries"] += 1
 
         try:
-            logger.info(f"Processing: {query[:100]}...")
+            context = self._prepare_context(query)
+
+            # Step 6: Generate answer
+            answer = self.generator.generate(
+                query, context["expanded"], context["extracted"], context["mode"]
+            )
+
+            return self._finalize_response(query, answer, context, start_time)
+
+        except Exception as e:
+            return self._error_response(query, e, start_time)
+
+    def stream_query(self, query: str) -> Iterator[Dict[str, Any]]:
+        """
+        Process a query, streaming the answer as it is generated.
+
+        Yields ``{"type": "token", "content": ...}`` events while the LLM
+        generates, then a single ``{"type": "done", "response": ...}`` event
+        carrying the final RAGResponse.
+
+        Args:
+            query: User query string
+
+        Yields:
+            Event dictionaries
+        """
+        start_time = time.time()
+        self.stats["total_queries"] += 1
+
+        try:
+            context = self._prepare_context(query)
+
+            # Step 6: Generate answer
+            chunks: List[str] = []
+            for chunk in self.generator.generate_stream(
+                query, context["expanded"], context["extracted"], context["mode"]
+            ):
+                chunks.append(chunk)
+                yield {"type": "token", "content": chunk}
+
+            response = self._finalize_response(
+                query, "".join(chunks).strip(), context, start_time
+            )
+
+        except Exception as e:
+            response = self._error_response(query, e, start_time)
+
+        yield {"type": "done", "response": response}
 
-            # Step 1: Extract entities
-            extracted = self.extractor.extract(query)
-            logger.info(f"Extracted: {extracted}")
+    def _prepare_context(self, query: str) -> Dict[str, Any]:
+        """Run extraction, retrieval, reranking and expansion (steps 1-5)."""
+        logger.info(f"Processing: {query[:100]}...")
 
-            # Step 2: Determine mode
-            mode = self._determine_mode(query, extracted)
-            self.stats["mode_usage"][mode] += 1
+        # Step 1: Extract entities
+        extracted = self.extractor.extract(query)
+        logger.info(f"Extracted: {extracted}")
 
-            # Step 3: Retrieve documents
-            docs = self._retrieve(query, extracted, mode)
-            logger.info(f"Retrieved: {len(docs)} documents")
+        # Step 2: Determine mode
+        mode = self._determine_mode(query, extracted)
+        self.stats["mode_usage"][mode] += 1
 
-            # Step 4: Rerank
+        # Step 3: Retrieve documents
+        docs = self._retrieve(query, extracted, mode)
+        logger.info(f"Retrieved: {len(docs)} documents")
+
+        # Step 4: Rerank. Lecturer answers filter on metadata and never use
+        # the scores, so they skip the model and keep the top retrieved docs.
+        if mode == "lecturer" and self.settings.skip_lecturer_rerank:
+            reranked, scores = docs[:self.settings.top_k_rerank], []
+        else:
             reranked, scores = self.reranker.rerank(
-                query, docs, self.settings.top_k_rerank
+                query, docs, self.settings.top_k_rerank,
+                shallow_k=self.settings.rerank_shallow_k
             )
 
-            # Step 5: Expand context
-            if mode == "comparison" and extracted.get("comparison_codes"):
-                axes = ContextExpander.infer_comparison_axes(query)
-                expanded = self.expander.expand_for_comparison(
-                    reranked, extracted["comparison_codes"], axes
-                )
-            else:
-                expanded = self.expander.expand(reranked, query)
+        # Normalize each document's fields once for expansion, confidence
+        # and sources
+        views = [DocView(doc) for doc in reranked]
 
-            # Step 6: Generate answer
-            answer = self.generator.generate(query, expanded, extracted, mode)
-
-            # Step 7: Calculate confidence
-            try:
-                conf_metrics = self.confidence.calculate_confidence(
-                    query=query,
-                    answer=answer,
-                    retrieved_docs=docs,
-                    reranked_docs=reranked,
-                    rerank_scores=scores,
-                    extracted_entities=extracted,
-                    generation_mode=mode
-                )
-                confidence = conf_metrics.final_confidence
-                reasoning_steps = [conf_metrics.reasoning]
-            except Exception as e:
-                logger.warning(f"Confidence calculation failed: {e}")
-                confidence = 0.5
-                reasoning_steps = ["Confidence calculation skipped"]
-
-            processing_time = time.time() - start_time
-            self.stats["successful_queries"] += 1
-
-            # Update average time
-            n = self.stats["successful_queries"]
-            self.stats["average_time"] = (
-                (self.stats["average_time"] * (n - 1) + processing_time) / n
+        # Step 5: Expand context
+        if mode == "comparison" and extracted.get("comparison_codes"):
+            axes = ContextExpander.infer_comparison_axes(query)
+            expanded = self.expander.expand_for_comparison(
+                reranked, extracted["comparison_codes"], axes, views=views
             )
+        else:
+            expanded = self.expander.expand(reranked, query, views=views)
+
+        # Expansion only appends documents after the reranked ones
+        expanded_views = views + [DocView(doc) for doc in expanded[len(reranked):]]
+
+        return {
+            "extracted": extracted,
+            "mode": mode,
+            "docs": docs,
+            "reranked": reranked,
+            "scores": scores,
+            "expanded": expanded,
+            "views": views,
+            "expanded_views": expanded_views,
+        }
 
-            return RAGResponse(
+    def _finalize_response(
+        self,
+        query: str,
+        answer: str,
+        context: Dict[str, Any],
+        start_time: float
+    ) -> RAGResponse:
+        """Score the answer (step 7), update stats and build the response."""
+        extracted = context["extracted"]
+        mode = context["mode"]
+        expanded = context["expanded"]
+
+        # Step 7: Calculate confidence
+        try:
+            conf_metrics = self.confidence.calculate_confidence(
                 query=query,
                 answer=answer,
-                confidence=confidence,
-                sources=self._extract_sources(expanded),
+                retrieved_docs=context["docs"],
+                reranked_docs=context["reranked"],
+                rerank_scores=context["scores"],
+                extracted_entities=extracted,
                 generation_mode=mode,
-                processing_time=processing_time,
-                reasoning_steps=reasoning_steps,
-                conflicts_detected=[],
-                metadata={
-                    "extracted": extracted,
-                    "doc_count": len(expanded),
-                    "mode": mode
-                }
+                reranked_views=context["views"]
             )
-
+            confidence = conf_metrics.final_confidence
+            reasoning_steps = [conf_metrics.reasoning]
         except Exception as e:
-            logger.error(f"Query processing failed: {e}")
-            return RAGResponse(
-                query=query,
-                answer=f"Error processing query: {str(e)}",
-                confidence=0.0,
-                sources=[],
-                generation_mode="error",
-                processing_time=time.time() - start_time,
-                reasoning_steps=[f"Error: {str(e)}"],
-                conflicts_detected=[],
-                metadata={"error": str(e)}
-            )
+            logger.warning(f"Confidence calculation failed: {e}")
+            confidence = 0.5
+            reasoning_steps = ["Confidence calculation skipped"]
+
+        processing_time = time.time() - start_time
+        self.stats["successful_queries"] += 1
+
+        # Update average time
+        n = self.stats["successful_queries"]
+        self.stats["average_time"] = (
+            (self.stats["average_time"] * (n - 1) + processing_time) / n
+        )
+
+        return RAGResponse(
+            query=query,
+            answer=answer,
+            confidence=confidence,
+            sources=self._extract_sources(context["expanded_views"]),
+            generation_mode=mode,
+            processing_time=processing_time,
+            reasoning_steps=reasoning_steps,
+            conflicts_detected=[],
+            metadata={
+                "extracted": extracted,
+                "doc_count": len(expanded),
+                "mode": mode
+            }
+        )
+
+    def _error_response(self, query: str, error: Exception, start_time: float) -> RAGResponse:
+        """Build the response returned when the pipeline fails."""
+        logger.error(f"Query processing failed: {error}")
+        # Generation failures already carry a user-facing message
+        if isinstance(error, GenerationError):
+            answer = str(error)
+        else:
+            answer = f"Error processing query: {str(error)}"
+        return RAGResponse(
+            query=query,
+            answer=answer,
+            confidence=0.0,
+            sources=[],
+            generation_mode="error",
+            processing_time=time.time() - start_time,
+            reasoning_steps=[f"Error: {str(error)}"],
+            conflicts_detected=[],
+            metadata={"error": str(error)}
+        )
 
     def _determine_mode(self, query: str, extracted: Dict[str, Any]) -> str:
         """Determine processing mode."""
-        if is_lecturer_query(query):
-            return "lecturer"
-        if is_comparison_query(query) or extracted.get("comparison_codes"):
+        mode = classify_query(query)
+        if mode == "standard" and extracted.get("comparison_codes"):
             return "comparison"
-        return "standard"
+        return mode
 
     def _retrieve(
         self,
@@ -225,23 +356,21 @@ class ContextAwareRetrievalAgent:
         else:
             return self.retriever.search(query, filters)
 
-    def _extract_sources(self, docs: List[Document]) -> List[str]:
-        """Extract source identifiers from documents."""
-        sources = []
-        seen = set()
+    def _extract_sources(self, views: List[DocView]) -> List[str]:
+        """Extract source identifiers from document views."""
+        # Dict keys dedupe while keeping first-seen order
+        sources: Dict[str, None] = {}
 
-        for doc in docs:
-            meta = doc.metadata or {}
-            code = meta.get("course_code", "")
-            section = meta.get("section_title", "")
+        for view in views:
+            code = view.course_code
+            section = view.section_title
 
             source = f"{code}:{section}" if code else section
 
-            if source and source not in seen:
-                sources.append(source)
-                seen.add(source)
+            if source:
+                sources[source] = None
 
-        return sources
+        return list(sources)
 
     def get_stats(self) -> Dict[str, Any]:
         """Get agent statistics."""
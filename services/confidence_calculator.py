@@ -6,6 +6,7 @@ Advanced confidence calculation using multiple metrics and LLM evaluation.
 
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Dict, Any, Tuple, Optional
 
 import numpy as np
@@ -13,10 +14,32 @@ from langchain_core.documents import Document
 from langchain_ollama import ChatOllama
 
 from models.confidence import ConfidenceMetrics
+from models.doc_view import DocView
 from config.constants import CONFIDENCE_WEIGHTS
 
 logger = logging.getLogger(__name__)
 
+# Section keyword expected in retrieved section titles -> query triggers.
+# "prereq" also covers "prerequisite", and "outcome" covers "learning outcome".
+_COMPLETENESS_TRIGGERS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("prerequisites", ("prereq",)),
+    ("assessment", ("assessment", "exam", "grading")),
+    ("learning", ("outcome",)),
+    ("teaching", ("teaching", "method")),
+    ("content", ("content", "summary", "about")),
+)
+
+# Ollama structured-output schema for the coherence verdict; decoding is
+# constrained to it, so the reply is always exactly this object
+_COHERENCE_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "confidence_score": {"type": "number"},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["confidence_score", "reasoning"],
+}
+
 
 class ConfidenceCalculator:
     """
@@ -30,20 +53,48 @@ class ConfidenceCalculator:
     - Semantic coherence (LLM-evaluated)
     """
 
-    def __init__(self, ollama_base_url: str = "http://localhost:11434"):
+    def __init__(
+        self,
+        ollama_base_url: str = "http://localhost:11434",
+        sync_client_kwargs: Optional[Dict[str, Any]] = None,
+        llm: Optional[ChatOllama] = None,
+        enable_semantic: bool = True,
+        semantic_timeout: Optional[float] = None
+    ):
         """
         Initialize confidence calculator.
 
         Args:
             ollama_base_url: URL for Ollama LLM service
+            sync_client_kwargs: Optional httpx client arguments, e.g. a
+                shared transport for connection reuse
+            llm: Optional JSON-mode ChatOllama to reuse for coherence
+                evaluation instead of building a second client
+            enable_semantic: Whether to ask the LLM for semantic coherence;
+                when False the heuristic fallback is always used
+            semantic_timeout: Seconds to wait for the coherence LLM before
+                using the heuristic fallback (None waits indefinitely)
         """
-        self.confidence_llm = ChatOllama(
-            model="llama3.1:latest",
-            base_url=ollama_base_url,
-            temperature=0,
-            format="json"
+        self.enable_semantic = enable_semantic
+        self.semantic_timeout = semantic_timeout
+        # Timed-out calls keep running in the pool; they are not cancelled
+        self._semantic_executor = (
+            ThreadPoolExecutor(max_workers=4, thread_name_prefix="confidence")
+            if enable_semantic and semantic_timeout is not None else None
         )
 
+        if llm is not None:
+            self.confidence_llm = llm
+        else:
+            self.confidence_llm = ChatOllama(
+                model="llama3.1:latest",
+                base_url=ollama_base_url,
+                temperature=0,
+                format="json",
+                keep_alive="10m",
+                sync_client_kwargs=sync_client_kwargs
+            )
+
     def calculate_confidence(
         self,
         query: str,
@@ -52,7 +103,8 @@ class ConfidenceCalculator:
         reranked_docs: List[Document],
         rerank_scores: Optional[List[float]] = None,
         extracted_entities: Optional[Dict[str, Any]] = None,
-        generation_mode: str = "standard"
+        generation_mode: str = "standard",
+        reranked_views: Optional[List[DocView]] = None
     ) -> ConfidenceMetrics:
         """
         Calculate comprehensive confidence score.
@@ -65,25 +117,34 @@ class ConfidenceCalculator:
             rerank_scores: Scores from cross-encoder
             extracted_entities: Extracted entities from query
             generation_mode: Generation mode (standard/comparison/lecturer)
+            reranked_views: Precomputed views of reranked_docs, in the same order
 
         Returns:
             ConfidenceMetrics with all scores
         """
         rerank_scores = rerank_scores or []
         extracted_entities = extracted_entities or {}
+        views = reranked_views
+        if views is None:
+            views = [DocView(doc) for doc in reranked_docs]
 
         # Calculate individual metrics
         rerank_conf = self._calculate_rerank_confidence(rerank_scores)
         entity_conf = self._calculate_entity_match_confidence(
-            query, reranked_docs, extracted_entities
+            query, views, extracted_entities
         )
-        source_conf = self._calculate_source_diversity(reranked_docs, generation_mode)
+        source_conf = self._calculate_source_diversity(views, generation_mode)
         complete_conf = self._calculate_context_completeness(
-            query, reranked_docs, extracted_entities
-        )
-        semantic_conf, reasoning = self._calculate_semantic_coherence(
-            query, answer, reranked_docs
+            query, views, extracted_entities
         )
+        if not views or not answer.strip():
+            # Nothing for the LLM to judge; skip the round-trip
+            semantic_conf = self._fallback_evaluation(query, answer, views)
+            reasoning = "No documents retrieved" if not views else "Empty answer"
+        else:
+            semantic_conf, reasoning = self._calculate_semantic_coherence(
+                query, answer, views
+            )
 
         # Get weights for this mode
         weights = CONFIDENCE_WEIGHTS.get(generation_mode, CONFIDENCE_WEIGHTS["standard"])
@@ -136,11 +197,11 @@ class ConfidenceCalculator:
     def _calculate_entity_match_confidence(
         self,
         query: str,
-        docs: List[Document],
+        views: List[DocView],
         extracted: Dict[str, Any]
     ) -> float:
         """Calculate confidence from entity matching."""
-        if not docs:
+        if not views:
             return 0.0
 
         expected = set()
@@ -156,16 +217,18 @@ class ConfidenceCalculator:
             return 0.7  # Neutral
 
         matched = set()
-        for doc in docs:
-            meta = doc.metadata or {}
-            content = (doc.page_content or "").lower()
-
-            if meta.get("course_code", "").lower() in expected:
-                matched.add(meta["course_code"].lower())
-            if meta.get("course_title", "").lower() in expected:
-                matched.add(meta["course_title"].lower())
-
-            for entity in expected:
+        for view in views:
+            if view.code_lower in expected:
+                matched.add(view.code_lower)
+            if view.title_lower in expected:
+                matched.add(view.title_lower)
+
+            remaining = expected - matched
+            if not remaining:
+                break
+
+            content = view.content_lower
+            for entity in remaining:
                 if entity in content:
                     matched.add(entity)
 
@@ -173,25 +236,24 @@ class ConfidenceCalculator:
 
     def _calculate_source_diversity(
         self,
-        docs: List[Document],
+        views: List[DocView],
         mode: str
     ) -> float:
         """Calculate confidence from source diversity."""
-        if not docs:
+        if not views:
             return 0.0
 
         courses = set()
         sections = set()
 
-        for doc in docs:
-            meta = doc.metadata or {}
-            if meta.get("course_code"):
-                courses.add(meta["course_code"])
-            if meta.get("section_title"):
-                sections.add(meta["section_title"])
+        for view in views:
+            if view.course_code:
+                courses.add(view.course_code)
+            if view.section_title:
+                sections.add(view.section_title)
 
-        course_div = min(1.0, len(courses) / max(1, len(docs)))
-        section_div = min(1.0, len(sections) / max(1, len(docs)))
+        course_div = min(1.0, len(courses) / max(1, len(views)))
+        section_div = min(1.0, len(sections) / max(1, len(views)))
 
         if mode == "comparison":
             return course_div * 0.8 + section_div * 0.2
@@ -203,36 +265,31 @@ class ConfidenceCalculator:
     def _calculate_context_completeness(
         self,
         query: str,
-        docs: List[Document],
+        views: List[DocView],
         extracted: Dict[str, Any]
     ) -> float:
         """Calculate context completeness."""
-        if not docs:
+        if not views:
             return 0.0
 
         q = query.lower()
-        expected = set()
-
-        if any(w in q for w in ["prerequisite", "prereq"]):
-            expected.add("prerequisites")
-        if any(w in q for w in ["assessment", "exam", "grading"]):
-            expected.add("assessment")
-        if any(w in q for w in ["learning outcome", "outcome"]):
-            expected.add("learning")
-        if any(w in q for w in ["teaching", "method"]):
-            expected.add("teaching")
-        if any(w in q for w in ["content", "summary", "about"]):
-            expected.add("content")
+        expected = {
+            section
+            for section, triggers in _COMPLETENESS_TRIGGERS
+            if any(w in q for w in triggers)
+        }
 
         if not expected:
             return 0.8  # Neutral
 
         present = set()
-        for doc in docs:
-            section = (doc.metadata or {}).get("section_title", "").lower()
-            for exp in expected:
+        for view in views:
+            section = view.section_lower
+            for exp in expected - present:
                 if exp in section:
                     present.add(exp)
+            if len(present) == len(expected):
+                break
 
         return len(present) / len(expected)
 
@@ -240,45 +297,48 @@ class ConfidenceCalculator:
         self,
         query: str,
         answer: str,
-        docs: List[Document]
+        views: List[DocView]
     ) -> Tuple[float, str]:
         """Evaluate semantic coherence using LLM."""
+        if not self.enable_semantic:
+            return self._fallback_evaluation(query, answer, views), "Heuristic evaluation"
+
         prompt = f"""Evaluate this RAG response. Return ONLY valid JSON.
 
 Query: {query[:100]}...
 Answer: {answer[:200]}...
-Context: {len(docs)} documents
+Context: {len(views)} documents
 
 Return JSON:
 {{"confidence_score": 0.75, "reasoning": "Brief explanation"}}"""
 
         try:
-            response = self.confidence_llm.invoke(prompt)
-            content = response.content.strip()
-
-            # Extract JSON
-            start = content.find('{')
-            end = content.rfind('}') + 1
-
-            if start != -1 and end > start:
-                data = json.loads(content[start:end])
+            if self._semantic_executor is not None:
+                future = self._semantic_executor.submit(
+                    self.confidence_llm.invoke, prompt, format=_COHERENCE_SCHEMA
+                )
+                response = future.result(timeout=self.semantic_timeout)
             else:
-                data = json.loads(content)
+                response = self.confidence_llm.invoke(prompt, format=_COHERENCE_SCHEMA)
+            data = json.loads(response.content)
 
             score = float(data.get("confidence_score", 0.5))
             reasoning = str(data.get("reasoning", "Evaluation completed"))
 
             return max(0.0, min(1.0, score)), reasoning
 
+        except FutureTimeoutError:
+            logger.warning(f"Semantic evaluation timed out after {self.semantic_timeout}s")
+            return self._fallback_evaluation(query, answer, views), "Fallback evaluation"
         except Exception as e:
             logger.warning(f"Semantic evaluation failed: {e}")
-            return self._fallback_evaluation(query, answer, docs), "Fallback evaluation"
+            return self._fallback_evaluation(query, answer, views), "Fallback evaluation"
 
     def _fallback_evaluation(
         self,
         query: str,
         answer: str,
-        docs: List[Document]
+        views: List[DocView]
     ) -> float:
         """Heuristic fallback when LLM fails."""
         score = 0.5
@@ -294,10 +354,8 @@ Return JSON:
         overlap = len(q_terms & a_terms)
         score += min(0.2, overlap * 0.05)
 
-        if docs and any(
-            (d.metadata or {}).get("course_code", "").lower() in answer.lower()
-            for d in docs[:3]
-        ):
+        answer_lower = answer.lower()
+        if views and any(v.code_lower in answer_lower for v in views[:3]):
             score += 0.1
 
         return max(0.0, min(1.0, score))
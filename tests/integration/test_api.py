@@ -2,9 +2,24 @@
 Integration Tests for API Module
 """
 
+import json
+
 import pytest
 from flask import Flask
 from api.app import create_app
+from models.state import RAGResponse
+from utils.response_cache import ResponseCache
+
+# Fields shared by every mock response; nothing in the API mutates them
+_TEMPLATE_RESPONSE_KWARGS = dict(
+    confidence=0.85,
+    sources=["source1"],
+    generation_mode="standard",
+    processing_time=1.0,
+    reasoning_steps=["processed"],
+    conflicts_detected=[],
+    metadata={"test": True}
+)
 
 
 class MockAgent:
@@ -20,25 +35,43 @@ class MockAgent:
 
         # Mock catalog
         self.catalog = MockCatalog()
+        self.calls = 0
 
     def process_query(self, query: str):
-        from models.state import RAGResponse
+        self.calls += 1
         return RAGResponse(
             query=query,
             answer=f"Answer to: {query}",
-            confidence=0.85,
-            sources=["source1"],
-            generation_mode="standard",
-            processing_time=1.0,
-            reasoning_steps=["processed"],
-            conflicts_detected=[],
-            metadata={"test": True}
+            **_TEMPLATE_RESPONSE_KWARGS
         )
 
+    def stream_query(self, query: str):
+        yield {"type": "token", "content": "Answer to: "}
+        yield {"type": "token", "content": query}
+        yield {"type": "done", "response": self.process_query(query)}
+
     def get_stats(self):
         return self.stats
 
 
+class FailingGenerationAgent(MockAgent):
+    """Mock agent whose LLM fails, returning the agent's error response."""
+
+    def process_query(self, query: str):
+        self.calls += 1
+        return RAGResponse(
+            query=query,
+            answer="Sorry, I encountered an error generating the answer.",
+            confidence=0.0,
+            sources=[],
+            generation_mode="error",
+            processing_time=0.1,
+            reasoning_steps=["Error: generation failed"],
+            conflicts_detected=[],
+            metadata={"error": "generation failed"}
+        )
+
+
 class MockCatalog:
     """Mock catalog for testing."""
 
@@ -140,6 +173,10 @@ class TestQueryEndpoint:
                               content_type='application/json')
         assert response.status_code == 400
 
+    def test_non_string_query_rejected(self, client):
+        response = client.post('/api/query', json={'query': ['a']})
+        assert response.status_code == 400
+
     def test_empty_query_rejected(self, client):
         response = client.post('/api/query',
                               json={'query': '   '},
@@ -147,6 +184,71 @@ class TestQueryEndpoint:
         assert response.status_code == 400
 
 
+class TestQueryCache:
+    """Tests for /api/query response caching."""
+
+    @pytest.fixture
+    def cached_app(self):
+        app = create_app(MockAgent(), response_cache=ResponseCache(ttl=60))
+        app.config['TESTING'] = True
+        return app
+
+    def test_repeat_query_served_from_cache(self, cached_app):
+        client = cached_app.test_client()
+        first = client.post('/api/query', json={'query': 'What is IoT?'})
+        second = client.post('/api/query', json={'query': '  what is  IoT? '})
+        assert first.get_json() == second.get_json()
+        assert cached_app.config['AGENT'].calls == 1
+
+    def test_failed_generation_not_cached(self):
+        app = create_app(FailingGenerationAgent(), response_cache=ResponseCache(ttl=60))
+        client = app.test_client()
+        client.post('/api/query', json={'query': 'What is IoT?'})
+        client.post('/api/query', json={'query': 'What is IoT?'})
+        assert app.config['AGENT'].calls == 2
+
+    def test_distinct_queries_not_shared(self, cached_app):
+        client = cached_app.test_client()
+        client.post('/api/query', json={'query': 'What is IoT?'})
+        client.post('/api/query', json={'query': 'What is Data Mining?'})
+        assert cached_app.config['AGENT'].calls == 2
+
+
+class TestQueryStream:
+    """Tests for /api/query/stream endpoint."""
+
+    def test_stream_returns_event_stream(self, client):
+        response = client.get('/api/query/stream?query=What%20is%20IoT%3F')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+    def test_stream_emits_tokens_then_done(self, client):
+        response = client.post('/api/query/stream', json={'query': 'What is IoT?'})
+        events = [
+            json.loads(line[len('data: '):])
+            for line in response.get_data(as_text=True).splitlines()
+            if line.startswith('data: ')
+        ]
+        assert [e['type'] for e in events] == ['token', 'token', 'done']
+        assert events[-1]['answer'] == 'Answer to: What is IoT?'
+
+    def test_stream_requires_query(self, client):
+        response = client.get('/api/query/stream')
+        assert response.status_code == 400
+
+    def test_stream_rejects_non_string_query(self, client):
+        response = client.post('/api/query/stream', json={'query': 123})
+        assert response.status_code == 400
+
+    def test_stream_uses_cache(self):
+        app = create_app(MockAgent(), response_cache=ResponseCache(ttl=60))
+        client = app.test_client()
+        client.post('/api/query', json={'query': 'What is IoT?'})
+        response = client.get('/api/query/stream?query=What%20is%20IoT%3F')
+        assert response.get_data(as_text=True).count('data: ') == 1
+        assert app.config['AGENT'].calls == 1
+
+
 class TestWebInterface:
     """Tests for web interface."""
 
@@ -159,6 +261,10 @@ class TestWebInterface:
         assert b'<!DOCTYPE html>' in response.data
         assert b'Academic RAG' in response.data
 
+    def test_index_is_cacheable(self, client):
+        response = client.get('/')
+        assert 'max-age' in response.headers['Cache-Control']
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -6,9 +6,9 @@ import pytest
 import os
 from config.settings import AppSettings
 from config.constants import (
-    COURSE_CODE_REGEX,
     COURSE_CODE_PATTERN,
     SECTION_KEYWORDS,
+    SECTION_KEYWORDS_LOWER,
     CONFIDENCE_WEIGHTS,
 )
 
@@ -39,19 +39,13 @@ class TestAppSettings:
 class TestConstants:
     """Tests for constants module."""
 
-    def test_course_code_regex_matches_valid(self):
-        import re
+    @pytest.mark.parametrize("code", ["2001WETGDT", "2500WETINT", "1234ABCXYZ"])
+    def test_course_code_regex_matches_valid(self, code):
+        assert COURSE_CODE_PATTERN.match(code) is not None
 
-        valid_codes = ["2001WETGDT", "2500WETINT", "1234ABCXYZ"]
-        for code in valid_codes:
-            assert re.match(COURSE_CODE_REGEX, code) is not None
-
-    def test_course_code_regex_rejects_invalid(self):
-        import re
-
-        invalid_codes = ["ABC123", "123", "WETGDT", "12WETGDT"]
-        for code in invalid_codes:
-            assert re.fullmatch(COURSE_CODE_REGEX, code) is None
+    @pytest.mark.parametrize("code", ["ABC123", "123", "WETGDT", "12WETGDT"])
+    def test_course_code_regex_rejects_invalid(self, code):
+        assert COURSE_CODE_PATTERN.fullmatch(code) is None
 
     def test_section_keywords_structure(self):
         assert "prereq" in SECTION_KEYWORDS
@@ -64,6 +58,11 @@ class TestConstants:
         for value in SECTION_KEYWORDS.values():
             assert isinstance(value, list)
 
+    def test_section_keywords_lower_mirrors_keywords(self):
+        assert SECTION_KEYWORDS_LOWER.keys() == SECTION_KEYWORDS.keys()
+        for key, sections in SECTION_KEYWORDS.items():
+            assert SECTION_KEYWORDS_LOWER[key] == [s.lower() for s in sections]
+
     def test_confidence_weights_structure(self):
         assert "comparison" in CONFIDENCE_WEIGHTS
         assert "lecturer" in CONFIDENCE_WEIGHTS
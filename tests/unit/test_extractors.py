@@ -0,0 +1,63 @@
+"""
+Unit Tests for Entity Extractor
+"""
+
+import types
+
+import pytest
+
+from langchain_core.documents import Document
+
+from core.extractors import EntityExtractor
+from models.catalog import MetadataCatalog
+
+
+class FlakyLLM:
+    """LLM stand-in that fails until told to recover."""
+
+    def __init__(self):
+        self.calls = 0
+        self.available = False
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        if not self.available:
+            raise ConnectionError("ollama unavailable")
+        return types.SimpleNamespace(content='{"course_code": "2500WETINT"}')
+
+
+@pytest.fixture
+def catalog():
+    return MetadataCatalog([Document(
+        page_content="x",
+        metadata={"course_code": "2500WETINT", "course_title": "Internet of Things"}
+    )])
+
+
+class TestLLMFallbackCaching:
+    """Tests for memoization of the LLM fallback stage."""
+
+    def test_failed_llm_call_not_memoized(self, catalog):
+        llm = FlakyLLM()
+        extractor = EntityExtractor(catalog, llm)
+
+        assert extractor.extract("tell me something nice") == {}
+        llm.available = True
+        result = extractor.extract("tell me something nice")
+
+        assert result["course_code"] == "2500WETINT"
+        assert llm.calls == 2
+
+    def test_successful_llm_call_memoized(self, catalog):
+        llm = FlakyLLM()
+        llm.available = True
+        extractor = EntityExtractor(catalog, llm)
+
+        extractor.extract("tell me something nice")
+        extractor.extract("tell me  something nice")
+
+        assert llm.calls == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,43 @@
+"""
+Unit Tests for Answer Generator
+"""
+
+import pytest
+
+from langchain_core.documents import Document
+
+from core.generator import AnswerGenerator, GenerationError
+
+
+class FailingLLM:
+    """LLM stand-in whose stream fails, as during an Ollama outage."""
+
+    def stream(self, prompt):
+        raise ConnectionError("ollama unavailable")
+
+
+@pytest.fixture
+def docs():
+    return [Document(
+        page_content="Covers sensors and networks.",
+        metadata={"course_code": "2500WETINT", "section_title": "Content"}
+    )]
+
+
+class TestGenerationFailure:
+    """Tests for LLM failures during generation."""
+
+    def test_generate_raises_generation_error(self, docs):
+        generator = AnswerGenerator(FailingLLM())
+        with pytest.raises(GenerationError) as exc_info:
+            generator.generate("What is IoT?", docs, {}, "standard")
+        assert "Sorry" in str(exc_info.value)
+
+    def test_stream_raises_generation_error(self, docs):
+        generator = AnswerGenerator(FailingLLM())
+        with pytest.raises(GenerationError):
+            list(generator.generate_stream("What is IoT?", docs, {}, "standard"))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -6,6 +6,7 @@ import pytest
 from models.state import RAGResponse
 from models.confidence import ConfidenceMetrics
 from models.catalog import MetadataCatalog
+from models.doc_view import DocView
 from langchain_core.documents import Document
 
 
@@ -161,6 +162,21 @@ class TestMetadataCatalog:
         result = catalog.fuzzy_title_to_code("Completely Different")
         assert result is None
 
+    def test_fuzzy_titles_to_codes_matches_single(self, sample_docs):
+        catalog = MetadataCatalog(sample_docs)
+
+        titles = ["Data Minng", "Internet Things", "Completely Different", ""]
+        assert catalog.fuzzy_titles_to_codes(titles) == [
+            catalog.fuzzy_title_to_code(title) for title in titles
+        ]
+
+    def test_codes_with_title_in(self, sample_docs):
+        catalog = MetadataCatalog(sample_docs)
+
+        codes = catalog.codes_with_title_in("Compare internet of things and DATA MINING")
+        assert codes == ["2001WETGDT", "2500WETINT"]
+        assert catalog.codes_with_title_in("What is grading?") == []
+
     def test_get_all_codes(self, sample_docs):
         catalog = MetadataCatalog(sample_docs)
 
@@ -176,5 +192,29 @@ class TestMetadataCatalog:
         assert stats["total_unique_titles"] == 2
 
 
+class TestDocView:
+    """Tests for DocView."""
+
+    def test_normalized_fields(self):
+        doc = Document(
+            page_content="Covers IoT Protocols",
+            metadata={"course_code": "2500WETINT", "section_title": "Course Contents"}
+        )
+
+        view = DocView(doc)
+        assert view.code_lower == "2500wetint"
+        assert view.section_lower == "course contents"
+        assert view.course_title == ""
+        assert view.content_lower == "covers iot protocols"
+
+    def test_view_reflects_current_metadata(self):
+        doc = Document(page_content="Text", metadata={"course_code": "A"})
+        DocView(doc)
+
+        doc.metadata["course_code"] = "B"
+        assert DocView(doc).course_code == "B"
+        assert not hasattr(doc, "_view")
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
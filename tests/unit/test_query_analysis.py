@@ -9,6 +9,7 @@ from utils.query_analysis import (
     is_lecturer_query,
     extract_lecturer_from_query,
     is_comparison_query,
+    classify_query,
     extract_course_mentions,
     infer_target_sections,
 )
@@ -49,6 +50,14 @@ class TestLecturerMatches:
     def test_none_metadata_returns_false(self):
         assert lecturer_matches(None, "john") is False
 
+    def test_matches_name_in_list(self):
+        metadata = {"lecturers": ["John Doe", "Jane Smith"]}
+        assert lecturer_matches(metadata, "jane smith") is True
+
+    def test_no_match_across_list_entries(self):
+        metadata = {"lecturers": ["John Doe", "Jane Smith"]}
+        assert lecturer_matches(metadata, "doe jane") is False
+
 
 class TestIsLecturerQuery:
     """Tests for is_lecturer_query function."""
@@ -108,6 +117,24 @@ class TestIsComparisonQuery:
         assert is_comparison_query("Tell me about IoT") is False
 
 
+class TestClassifyQuery:
+    """Tests for classify_query function."""
+
+    def test_lecturer_query(self):
+        assert classify_query("Which courses are taught by John Smith?") == "lecturer"
+
+    def test_comparison_query(self):
+        assert classify_query("Compare IoT and Data Mining") == "comparison"
+
+    def test_standard_query(self):
+        assert classify_query("Tell me about IoT") == "standard"
+
+    def test_lecturer_takes_precedence(self):
+        query = "Compare the courses taught by John Smith"
+        assert is_comparison_query(query) is True
+        assert classify_query(query) == "lecturer"
+
+
 class TestExtractCourseMentions:
     """Tests for extract_course_mentions function."""
 
@@ -130,6 +157,12 @@ class TestExtractCourseMentions:
         iot_count = sum(1 for m in result if m.lower() == "iot")
         assert iot_count == 1
 
+    def test_repeated_calls_return_independent_lists(self):
+        first = extract_course_mentions("Compare 'Data Mining' and 'IoT'")
+        first.append("mutated")
+        second = extract_course_mentions("Compare 'Data Mining' and 'IoT'")
+        assert "mutated" not in second
+
 
 class TestInferTargetSections:
     """Tests for infer_target_sections function."""
@@ -159,6 +192,12 @@ class TestInferTargetSections:
         result = infer_target_sections("Tell me about IoT")
         assert result is None
 
+    def test_repeated_calls_return_independent_lists(self):
+        first = infer_target_sections("What are the prerequisites?")
+        first.append("mutated")
+        second = infer_target_sections("What are the prerequisites?")
+        assert "mutated" not in second
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Unit Tests for Response Cache
+"""
+
+import pytest
+
+from utils.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Tests for ResponseCache."""
+
+    def test_miss_then_hit(self):
+        cache = ResponseCache(ttl=60)
+        payload, hit = cache.get_or_compute("query", lambda: {"answer": "a"})
+        assert not hit
+        payload, hit = cache.get_or_compute("query", lambda: {"answer": "b"})
+        assert hit
+        assert payload == {"answer": "a"}
+
+    def test_key_normalizes_case_and_whitespace(self):
+        assert ResponseCache.make_key("What is IoT?") == ResponseCache.make_key("  what  is iot? ")
+
+    def test_expired_entry_recomputed(self):
+        cache = ResponseCache(ttl=-1)
+        cache.get_or_compute("query", lambda: {"answer": "a"})
+        payload, hit = cache.get_or_compute("query", lambda: {"answer": "b"})
+        assert not hit
+        assert payload == {"answer": "b"}
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(ttl=60, max_entries=2)
+        for q in ("a", "b", "c"):
+            cache.get_or_compute(q, lambda: {"answer": q})
+        assert cache.get_stats()["entries"] == 2
+        _, hit = cache.get_or_compute("a", lambda: {"answer": "x"})
+        assert not hit
+
+    def test_uncacheable_payload_not_stored(self):
+        cache = ResponseCache(ttl=60)
+        cache.get_or_compute("query", lambda: {"mode": "error"}, cacheable=lambda p: p["mode"] != "error")
+        _, hit = cache.get_or_compute("query", lambda: {"mode": "ok"})
+        assert not hit
+
+    def test_semantic_hit(self):
+        vectors = {"what is iot": [1.0, 0.0], "explain iot": [0.99, 0.05], "grading": [0.0, 1.0]}
+        cache = ResponseCache(ttl=60, embed_fn=lambda q: vectors[q], similarity_threshold=0.95)
+        cache.get_or_compute("what is iot", lambda: {"answer": "iot"})
+
+        payload, hit = cache.get_or_compute("explain iot", lambda: {"answer": "other"})
+        assert hit
+        assert payload == {"answer": "iot"}
+
+        _, hit = cache.get_or_compute("grading", lambda: {"answer": "grading"})
+        assert not hit
+
+    def test_miss_embeds_query_once(self):
+        vectors = {"what is iot": [1.0, 0.0], "grading": [0.0, 1.0]}
+        calls = []
+
+        def embed(query):
+            calls.append(query)
+            return vectors[query]
+
+        cache = ResponseCache(ttl=60, embed_fn=embed)
+        cache.get_or_compute("what is iot", lambda: {"answer": "iot"})
+        assert calls == ["what is iot"]
+
+        payload, embedding = cache.lookup("grading")
+        assert payload is None
+        cache.set("grading", {"answer": "grading"}, embedding=embedding)
+        assert calls == ["what is iot", "grading"]
+
+    def test_semantic_hit_requires_same_course_codes(self):
+        vectors = {
+            "prerequisites of 2001WETGDT": [1.0, 0.0],
+            "prerequisites of 2500WETINT": [0.999, 0.01],
+        }
+        cache = ResponseCache(ttl=60, embed_fn=lambda q: vectors[q], similarity_threshold=0.95)
+        cache.get_or_compute("prerequisites of 2001WETGDT", lambda: {"answer": "gdt"})
+
+        payload, hit = cache.get_or_compute("prerequisites of 2500WETINT", lambda: {"answer": "int"})
+        assert not hit
+        assert payload == {"answer": "int"}
+
+    def test_reset_key_replaces_vector_row(self):
+        vectors = {"a": [1.0, 0.0], "b": [0.0, 1.0]}
+        cache = ResponseCache(ttl=60, max_entries=2, embed_fn=lambda q: vectors[q])
+        cache.set("a", {"answer": "a"})
+        cache.set("b", {"answer": "b"})
+        cache.set("a", {"answer": "a2"})
+
+        assert sorted(cache._vector_keys) == sorted([cache.make_key("a"), cache.make_key("b")])
+        assert cache._vectors.shape == (2, 2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
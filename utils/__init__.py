@@ -6,6 +6,7 @@ from .query_analysis import (
     is_lecturer_query,
     extract_lecturer_from_query,
     is_comparison_query,
+    classify_query,
     extract_course_mentions,
     infer_target_sections,
 )
@@ -19,6 +20,7 @@ __all__ = [
     "is_lecturer_query",
     "extract_lecturer_from_query",
     "is_comparison_query",
+    "classify_query",
     "extract_course_mentions",
     "infer_target_sections",
     # Logging
@@ -5,10 +5,17 @@ This module provides centralized logging configuration for the application.
 """
 
 import logging
+import logging.handlers
 import sys
 from pathlib import Path
 from typing import Optional
 
+# File logging: rotate at 10 MB keeping 3 backups, and buffer records so
+# the file is written in batches rather than once per line
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+LOG_FILE_BUFFER_CAPACITY = 1024
+
 
 def setup_logging(
     level: int = logging.INFO,
@@ -20,7 +27,7 @@ def setup_logging(
 
     Args:
         level: Logging level (default: INFO)
-        log_file: Optional path to log file (default: logs/app.log)
+        log_file: Optional path to a rotating, buffered log file
         format_string: Custom format string (default: standard format)
     """
     if format_string is None:
@@ -33,7 +40,20 @@ def setup_logging(
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        handlers.append(logging.FileHandler(log_file))
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=LOG_FILE_MAX_BYTES,
+            backupCount=LOG_FILE_BACKUP_COUNT
+        )
+        # The buffer formats nothing itself, so the target needs the formatter
+        file_handler.setFormatter(logging.Formatter(format_string))
+        # Errors flush immediately; the rest is written when the buffer fills
+        # or at interpreter shutdown
+        handlers.append(logging.handlers.MemoryHandler(
+            capacity=LOG_FILE_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=file_handler
+        ))
 
     # Configure logging
     logging.basicConfig(
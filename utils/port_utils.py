@@ -4,9 +4,13 @@ Port Management Utilities
 Helper functions for port availability checking and management.
 """
 
+import os
 import socket
+import logging
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 def is_port_available(port: int, host: str = '127.0.0.1') -> bool:
     """
@@ -21,6 +25,11 @@ def is_port_available(port: int, host: str = '127.0.0.1') -> bool:
     """
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            if os.name != "nt":
+                # Match the server socket, which also sets SO_REUSEADDR, so a
+                # port left in TIME_WAIT counts as free (on Windows the flag
+                # would allow binding a port another process is listening on)
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             s.bind((host, port))
             return True
     except OSError:
@@ -28,7 +37,7 @@ def is_port_available(port: int, host: str = '127.0.0.1') -> bool:
 
 
 def find_available_port(
-    start_port: int = 5003,
+    start_port: Optional[int] = 5003,
     max_tries: int = 10,
     host: str = '127.0.0.1'
 ) -> Optional[int]:
@@ -36,10 +45,11 @@ def find_available_port(
     Find an available port starting from start_port.
 
     Iterates through port numbers starting from start_port until
-    an available port is found or max_tries is reached.
+    an available port is found or max_tries is reached. Without a
+    start port, the OS assigns any free port in a single bind.
 
     Args:
-        start_port: Starting port number to try
+        start_port: Starting port number to try, or None for any free port
         max_tries: Maximum number of ports to try
         host: Host address to bind to
 
@@ -49,6 +59,11 @@ def find_available_port(
     Raises:
         RuntimeError: If no available port found within range
     """
+    if start_port is None:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind((host, 0))
+            return s.getsockname()[1]
+
     for port in range(start_port, start_port + max_tries):
         if is_port_available(port, host):
             return port
@@ -73,7 +88,5 @@ def kill_process_on_port(port: int) -> bool:
     """
     # This would require psutil or platform-specific code
     # For now, return False to indicate not implemented
-    import logging
-    logger = logging.getLogger(__name__)
     logger.warning(f"kill_process_on_port({port}) not implemented")
     return False
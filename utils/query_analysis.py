@@ -6,16 +6,29 @@ extracting entities, and detecting query intent (comparison, lecturer, etc.).
 """
 
 import re
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 
 from config.constants import (
-    COURSE_CODE_REGEX,
+    COURSE_CODE_PATTERN,
     LECTURER_PATTERN,
     SECTION_KEYWORDS,
     LECTURER_QUERY_KEYWORDS,
     COMPARISON_QUERY_KEYWORDS,
 )
 
+# Query helpers run several times on the same query within one request
+# (extraction, mode selection, expansion), so their results are memoized
+_QUERY_CACHE_SIZE = 2048
+
+# Patterns compiled once at import
+_VS_RE = re.compile(r"\bvs\.?\b")
+_QUOTED_RE = re.compile(r"'([^']+)'|\"([^\"]+)\"")
+_BETWEEN_RE = re.compile(r"\bbetween\s+(.+?)\s+and\s+(.+?)(?:[?.!]|$)", flags=re.IGNORECASE)
+_TRAILING_PUNCT_RE = re.compile(r"[?.!]+$")
+_CONJUNCTION_SPLIT_RE = re.compile(r"\b(?:and|vs\.?|versus|,|؛|،)\b", flags=re.IGNORECASE)
+_FILLER_WORD_RE = re.compile(r"(compare|between|vs|and|versus|courses?)", flags=re.IGNORECASE)
+
 
 # ===== Lecturer-related Utilities =====
 
@@ -47,12 +60,22 @@ def lecturer_matches(metadata: Dict[str, Any], target_name_lc: str) -> bool:
     Returns:
         True if the lecturer matches, False otherwise
     """
-    if not target_name_lc:
+    if not target_name_lc or not metadata:
+        return False
+    val = metadata.get("lecturers")
+    if not val:
         return False
-    vals_lc = normalize_lecturers_field((metadata or {}).get("lecturers", ""))
-    return target_name_lc in vals_lc
+    if isinstance(val, str):
+        # Chroma stores lecturers as a plain string, the common case
+        return target_name_lc in val.lower()
+    if isinstance(val, list):
+        # Check names one at a time: stops at the first hit, skips the join,
+        # and a target can no longer match across two adjacent names
+        return any(target_name_lc in str(name).lower() for name in val)
+    return target_name_lc in normalize_lecturers_field(val)
 
 
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
 def is_lecturer_query(query: str) -> bool:
     """
     Detect if query is asking about courses taught by a lecturer.
@@ -67,6 +90,7 @@ def is_lecturer_query(query: str) -> bool:
     return any(keyword in ql for keyword in LECTURER_QUERY_KEYWORDS)
 
 
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
 def extract_lecturer_from_query(query: str) -> Optional[str]:
     """
     Extract lecturer name from query text.
@@ -90,6 +114,7 @@ def extract_lecturer_from_query(query: str) -> Optional[str]:
 
 # ===== Comparison Query Utilities =====
 
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
 def is_comparison_query(query: str) -> bool:
     """
     Detect comparison intent in query.
@@ -109,12 +134,32 @@ def is_comparison_query(query: str) -> bool:
         return True
 
     # Check for "vs" or "vs." pattern
-    if re.search(r"\bvs\.?\b", ql):
+    if _VS_RE.search(ql):
         return True
 
     return False
 
 
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def classify_query(query: str) -> str:
+    """
+    Classify query intent from its wording alone.
+
+    Lecturer intent takes precedence over comparison intent.
+
+    Args:
+        query: User query string
+
+    Returns:
+        "lecturer", "comparison" or "standard"
+    """
+    if is_lecturer_query(query):
+        return "lecturer"
+    if is_comparison_query(query):
+        return "comparison"
+    return "standard"
+
+
 def extract_course_mentions(query: str) -> List[str]:
     """
     Extract course titles/codes mentioned in comparison queries.
@@ -131,23 +176,29 @@ def extract_course_mentions(query: str) -> List[str]:
     Returns:
         List of extracted course mentions (deduplicated, order preserved)
     """
+    return list(_extract_course_mentions(query))
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _extract_course_mentions(query: str) -> Tuple[str, ...]:
+    """Memoized body of extract_course_mentions."""
     mentions: List[str] = []
 
     # 1) Text in quotes
-    for match in re.findall(r"'([^']+)'|\"([^\"]+)\"", query):
+    for match in _QUOTED_RE.findall(query):
         text = match[0] or match[1]
         if text and len(text.strip()) >= 2:
             mentions.append(text.strip())
 
     # 2) Direct course codes
-    for match in re.findall(COURSE_CODE_REGEX, query.upper()):
+    for match in COURSE_CODE_PATTERN.findall(query.upper()):
         mentions.append(match.strip())
 
     # 3) "between X and Y" pattern
-    match = re.search(r"\bbetween\s+(.+?)\s+and\s+(.+?)(?:[?.!]|$)", query, flags=re.IGNORECASE)
+    match = _BETWEEN_RE.search(query)
     if match:
-        a = re.sub(r"[?.!]+$", "", match.group(1)).strip()
-        b = re.sub(r"[?.!]+$", "", match.group(2)).strip()
+        a = _TRAILING_PUNCT_RE.sub("", match.group(1)).strip()
+        b = _TRAILING_PUNCT_RE.sub("", match.group(2)).strip()
         if a:
             mentions.append(a)
         if b:
@@ -155,26 +206,18 @@ def extract_course_mentions(query: str) -> List[str]:
 
     # 4) Split on conjunctions as fallback
     if len(mentions) < 2:
-        parts = re.split(r"\b(?:and|vs\.?|versus|,|؛|،)\b", query, flags=re.IGNORECASE)
+        parts = _CONJUNCTION_SPLIT_RE.split(query)
         for part in parts:
             part = part.strip(" ?!.·-–—\"'")
-            if len(part) >= 3 and not re.fullmatch(
-                r"(compare|between|vs|and|versus|courses?)",
-                part,
-                flags=re.IGNORECASE
-            ):
+            if len(part) >= 3 and not _FILLER_WORD_RE.fullmatch(part):
                 mentions.append(part)
 
-    # Remove duplicates while preserving order
-    seen = set()
-    unique_mentions = []
+    # Remove case-insensitive duplicates, keeping the first spelling and order
+    unique_mentions: Dict[str, str] = {}
     for mention in mentions:
-        key = mention.lower()
-        if key not in seen:
-            unique_mentions.append(mention)
-            seen.add(key)
+        unique_mentions.setdefault(mention.lower(), mention)
 
-    return unique_mentions
+    return tuple(unique_mentions.values())
 
 
 # ===== Section Inference =====
@@ -192,21 +235,28 @@ def infer_target_sections(query: str) -> Optional[List[str]]:
     Returns:
         List of relevant section titles if detected, None otherwise
     """
+    sections = _infer_target_sections(query)
+    return list(sections) if sections is not None else None
+
+
+@lru_cache(maxsize=_QUERY_CACHE_SIZE)
+def _infer_target_sections(query: str) -> Optional[Tuple[str, ...]]:
+    """Memoized body of infer_target_sections."""
     q = query.lower()
 
     if "prereq" in q or "prerequisites" in q or "prerequisite" in q:
-        return SECTION_KEYWORDS["prereq"]
+        return tuple(SECTION_KEYWORDS["prereq"])
 
     if "assessment" in q or "exam" in q or "grading" in q:
-        return SECTION_KEYWORDS["assessment"]
+        return tuple(SECTION_KEYWORDS["assessment"])
 
     if "learning outcome" in q:
-        return SECTION_KEYWORDS["learning"]
+        return tuple(SECTION_KEYWORDS["learning"])
 
     if "teaching method" in q or "planned learning" in q:
-        return SECTION_KEYWORDS["teaching"]
+        return tuple(SECTION_KEYWORDS["teaching"])
 
     if "content" in q or "summary" in q:
-        return SECTION_KEYWORDS["contents"]
+        return tuple(SECTION_KEYWORDS["contents"])
 
     return None
@@ -0,0 +1,285 @@
+"""
+Response Cache
+
+Two-tier cache for query responses: an exact tier keyed by a normalized
+query hash (Redis when configured, in-process LRU otherwise) and an
+optional semantic tier that matches near-duplicate queries by embedding
+cosine similarity, provided they name the same course codes.
+"""
+
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from config.constants import COURSE_CODE_PATTERN
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "rag:ans:"
+
+
+class ResponseCache:
+    """
+    Cache for serialized query responses.
+
+    The exact tier is shared across workers when a Redis URL is given and
+    the client is installed; otherwise a thread-safe in-process LRU with
+    per-entry expiry is used. The semantic tier is always in-process.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        max_entries: int = 1024,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        similarity_threshold: float = 0.95,
+        redis_url: Optional[str] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Entry lifetime in seconds
+            max_entries: Maximum in-process entries per tier
+            embed_fn: Optional query embedding function enabling semantic hits
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            redis_url: Optional Redis URL for the exact tier
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+        # Semantic tier: normalized query embeddings, their exact keys and
+        # the course codes each query names
+        self._vectors: Optional[np.ndarray] = None
+        self._vector_keys: List[str] = []
+        self._vector_codes: List[FrozenSet[str]] = []
+
+        self._redis = None
+        if redis_url:
+            if redis is None:
+                logger.warning("redis not installed, using in-process response cache")
+            else:
+                self._redis = redis.Redis.from_url(redis_url)
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        """Hash a query after whitespace and case normalization."""
+        normalized = " ".join(query.lower().split())
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _course_codes(query: str) -> FrozenSet[str]:
+        """Course codes named in a query, which a semantic hit must match."""
+        return frozenset(COURSE_CODE_PATTERN.findall(query.upper()))
+
+    def get_or_compute(
+        self,
+        query: str,
+        compute: Callable[[], Dict[str, Any]],
+        cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return a cached payload for the query, computing it on a miss.
+
+        Args:
+            query: User query string
+            compute: Callable producing the payload on a miss
+            cacheable: Optional predicate deciding whether to store a payload
+
+        Returns:
+            Tuple of (payload, cache_hit)
+        """
+        payload, embedding = self.lookup(query)
+        if payload is not None:
+            return payload, True
+
+        payload = compute()
+        if cacheable is None or cacheable(payload):
+            self.set(query, payload, embedding=embedding)
+
+        return payload, False
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached payload, trying the exact tier then the semantic tier.
+
+        Args:
+            query: User query string
+
+        Returns:
+            Cached payload, or None on a miss
+        """
+        return self.lookup(query)[0]
+
+    def lookup(self, query: str) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Look up a cached payload and return the query embedding computed for it.
+
+        Callers that store a payload after a miss pass the embedding back to
+        set(), so each missed query is embedded only once.
+
+        Args:
+            query: User query string
+
+        Returns:
+            Tuple of (cached payload or None, query embedding or None)
+        """
+        embedding = None
+        payload = self._get_exact(self.make_key(query))
+        if payload is None:
+            embedding = self._embed(query)
+            if embedding is not None:
+                similar_key = self._find_similar(embedding, self._course_codes(query))
+                if similar_key is not None:
+                    payload = self._get_exact(similar_key)
+
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload, embedding
+
+    def set(
+        self,
+        query: str,
+        payload: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Store a payload for the query in both tiers.
+
+        Args:
+            query: User query string
+            payload: JSON-serializable response payload
+            embedding: Query embedding from lookup(); computed when omitted
+        """
+        key = self.make_key(query)
+        self._set_exact(key, payload)
+        if embedding is None:
+            embedding = self._embed(query)
+        if embedding is not None:
+            self._add_vector(key, embedding, self._course_codes(query))
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+            self._vectors = None
+            self._vector_keys = []
+            self._vector_codes = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "backend": "redis" if self._redis is not None else "memory",
+            "entries": len(self._entries),
+            "semantic": self.embed_fn is not None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # ===== Exact Tier =====
+
+    def _get_exact(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(REDIS_KEY_PREFIX + key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"Redis get failed: {e}")
+                return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def _set_exact(self, key: str, payload: Dict[str, Any]) -> None:
+        if self._redis is not None:
+            try:
+                self._redis.setex(REDIS_KEY_PREFIX + key, self.ttl, json.dumps(payload))
+            except Exception as e:
+                logger.warning(f"Redis set failed: {e}")
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ===== Semantic Tier =====
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        try:
+            vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Query embedding failed, skipping semantic cache: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _find_similar(self, embedding: np.ndarray, codes: FrozenSet[str]) -> Optional[str]:
+        with self._lock:
+            if self._vectors is None:
+                return None
+            similarities = self._vectors @ embedding
+            # Queries differing only in the course code embed almost
+            # identically, so a hit must also name the same courses
+            candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+            for i in candidates[np.argsort(-similarities[candidates], kind="stable")]:
+                if self._vector_codes[i] == codes:
+                    return self._vector_keys[i]
+        return None
+
+    def _add_vector(self, key: str, embedding: np.ndarray, codes: FrozenSet[str]) -> None:
+        with self._lock:
+            # Re-setting a key (e.g. after its entry expired) replaces its row
+            # rather than adding a duplicate that pushes live entries out
+            if key in self._vector_keys:
+                index = self._vector_keys.index(key)
+                self._vectors = np.delete(self._vectors, index, axis=0)
+                del self._vector_keys[index]
+                del self._vector_codes[index]
+                if not self._vector_keys:
+                    self._vectors = None
+
+            if self._vectors is None:
+                self._vectors = embedding[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, embedding])
+            self._vector_keys.append(key)
+            self._vector_codes.append(codes)
+
+            overflow = len(self._vector_keys) - self.max_entries
+            if overflow > 0:
+                self._vectors = self._vectors[overflow:]
+                self._vector_keys = self._vector_keys[overflow:]
+                self._vector_codes = self._vector_codes[overflow:]
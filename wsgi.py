@@ -0,0 +1,20 @@
+"""
+WSGI Entry Point
+
+Builds the agent once per process and exposes the Flask app for a
+production WSGI server, e.g.:
+
+    gunicorn -k gthread -w 1 --threads 8 --timeout 300 -b 127.0.0.1:5003 wsgi:app
+
+A single process with threads keeps one copy of the embedding and
+reranker models in memory; threads overlap while requests wait on
+Ollama and Chroma.
+"""
+
+from utils.logging_config import setup_logging
+from main import build_agent
+from api.app import create_app
+
+setup_logging()
+
+app = create_app(build_agent())